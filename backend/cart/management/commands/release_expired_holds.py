@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cart.models import StockReservation
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired stock holds in batches. Expired holds already stop counting against "
+        "stock; this only keeps the table small. Run from cron, or with --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--interval", type=float, help="Keep running, sweeping every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            released = self.sweep(options["batch_size"])
+            self.stdout.write(f"released {released} expired holds")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def sweep(self, batch_size):
+        released = 0
+        now = timezone.now()
+        while True:
+            # short batches keep each DELETE's locks brief
+            ids = list(
+                StockReservation.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return released
+            released += StockReservation.objects.filter(id__in=ids, expires_at__lte=now).delete()[0]
@@ -22,3 +22,25 @@ class CartItem(models.Model):
     def __str__(self):
         owner = self.user.email if self.user else "anonymous"
         return f"{owner}: {self.product.name} x {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """
+    Stock held for a signed-in user's cart until expires_at (cart.reservations).
+    Available stock = stock - unexpired holds of other users.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "product")
+        indexes = [
+            models.Index(fields=["product", "expires_at"]),  # active holds per product
+            models.Index(fields=["expires_at"]),  # sweeper
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.product_id} x {self.quantity} until {self.expires_at:%H:%M}"
@@ -0,0 +1,91 @@
+"""
+Time-limited stock holds between cart and checkout.
+
+Adding to the cart and starting checkout hold the cart quantity, up to
+CART_HOLD_MAX_UNITS per product, for CART_HOLD_MINUTES from the first add. Other users see stock minus those holds, so during a sale
+they are told up front that an item is gone instead of failing at checkout.
+
+Holds are advisory: they are not taken under a lock, so two users can
+race for the last unit. The conditional decrement in CheckoutView
+(products.inventory) remains the guarantee against overselling. Expired
+holds are ignored by every read; release_expired_holds only deletes them
+to keep the table small.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from products.inventory import stock_levels
+from .models import StockReservation
+
+
+def hold_expiry():
+    return timezone.now() + timedelta(minutes=getattr(settings, "CART_HOLD_MINUTES", 15))
+
+
+def active_holds(product_ids, exclude_user=None):
+    """{product_id: units held} over unexpired holds, in one aggregate on (product, expires_at)."""
+    holds = StockReservation.objects.filter(product_id__in=product_ids, expires_at__gt=timezone.now())
+    if exclude_user is not None:
+        holds = holds.exclude(user=exclude_user)
+    rows = holds.values("product_id").annotate(held=Sum("quantity")).values_list("product_id", "held")
+    return dict(rows)
+
+
+def available_stock(products, user=None):
+    """{product_id: stock minus other users' holds}; the user's own holds do not count against them."""
+    levels = stock_levels(products)
+    held = active_holds(list(levels), exclude_user=user)
+    return {product_id: max(0, stock - held.get(product_id, 0)) for product_id, stock in levels.items()}
+
+
+def hold_stock(user, quantities):
+    """
+    Holds the user's quantities, {product_id: quantity}, each capped at
+    CART_HOLD_MAX_UNITS. A live hold keeps its expiry and only changes
+    quantity, so re-adding an item cannot keep stock held indefinitely;
+    expired holds are dropped first so the upsert starts them afresh.
+    """
+    cap = getattr(settings, "CART_HOLD_MAX_UNITS", 10)
+    StockReservation.objects.filter(user=user, product_id__in=list(quantities), expires_at__lte=timezone.now()).delete()
+    expires_at = hold_expiry()
+    StockReservation.objects.bulk_create(
+        [
+            StockReservation(user=user, product_id=product_id, quantity=min(quantity, cap), expires_at=expires_at)
+            for product_id, quantity in quantities.items()
+            if quantity > 0
+        ],
+        update_conflicts=True,
+        unique_fields=["user", "product"],
+        update_fields=["quantity"],
+    )
+
+
+def current_holds(user, product_ids):
+    """The user's hold rows for product_ids, to hand back to restore_holds."""
+    return list(StockReservation.objects.filter(user=user, product_id__in=list(product_ids)))
+
+
+def restore_holds(user, product_ids, previous):
+    """
+    Puts the user's holds on product_ids back to `previous` (from current_holds):
+    holds created since are dropped, earlier ones get their quantity and expiry back.
+    """
+    StockReservation.objects.filter(user=user, product_id__in=list(product_ids)).exclude(
+        product_id__in=[hold.product_id for hold in previous]
+    ).delete()
+    StockReservation.objects.bulk_create(
+        [
+            StockReservation(user=user, product_id=hold.product_id, quantity=hold.quantity, expires_at=hold.expires_at)
+            for hold in previous
+        ],
+        update_conflicts=True,
+        unique_fields=["user", "product"],
+        update_fields=["quantity", "expires_at"],
+    )
+
+
+def release_holds(user, product_ids):
+    StockReservation.objects.filter(user=user, product_id__in=product_ids).delete()
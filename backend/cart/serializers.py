@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from products.inventory import current_stock
 from .models import CartItem
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -9,8 +10,9 @@ class CartItemSerializer(serializers.ModelSerializer):
     def validate(self, data):
         product = data["product"]      
         quantity = data["quantity"]
-        if product.stock < quantity:
+        stock = current_stock(product)  # sums the shards for sharded products
+        if stock < quantity:
             raise serializers.ValidationError(
-                f"Only {product.stock} units available in stock."
+                f"Only {stock} units available in stock."
             )
         return data
\ No newline at end of file
@@ -1,3 +1,80 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from products.inventory import InsufficientStock
+from products.models import Product
+from .models import CartItem, StockReservation
+
+Customer = get_user_model()
+
+
+@override_settings(CART_HOLD_MAX_UNITS=3)
+class StockHoldTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='hold@example.com',
+            username='holduser',
+            password='pass123'
+        )
+        self.other = Customer.objects.create_user(
+            email='hold2@example.com',
+            username='holduser2',
+            password='pass123'
+        )
+        self.product = Product.objects.create(name='Held Product', price=10, stock=5)
+
+    def add(self, user, quantity):
+        self.client.force_authenticate(user=user)
+        return self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': quantity}, format='json')
+
+    def test_holds_are_capped_per_user(self):
+        self.assertEqual(self.add(self.user, 5).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(StockReservation.objects.get(user=self.user).quantity, 3)
+        self.assertEqual(self.add(self.other, 2).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.add(self.other, 1).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_re_adding_keeps_the_expiry(self):
+        self.add(self.user, 1)
+        expires_at = StockReservation.objects.get(user=self.user).expires_at
+
+        self.add(self.user, 1)
+
+        hold = StockReservation.objects.get(user=self.user)
+        self.assertEqual(hold.expires_at, expires_at)
+        self.assertEqual(hold.quantity, 2)
+
+    def test_failed_checkout_keeps_cart_holds(self):
+        self.add(self.user, 2)
+        held = StockReservation.objects.get(user=self.user)
+        unheld = Product.objects.create(name='Unheld Product', price=10, stock=5)
+        CartItem.objects.create(user=self.user, product=unheld, quantity=1)
+
+        response = self.client.post('/api/orders/checkout/', {'coupon_code': 'NOPE'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # another checkout takes the stock between the availability check and the decrement
+        with mock.patch('orders.views.decrement_stock', side_effect=InsufficientStock(self.product.id)):
+            response = self.client.post('/api/orders/checkout/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 5)
+        # the add-to-cart hold is untouched; the one taken by the checkout is gone
+        hold = StockReservation.objects.get(user=self.user)
+        self.assertEqual((hold.product_id, hold.quantity, hold.expires_at), (self.product.id, 2, held.expires_at))
+
+    def test_merge_respects_other_holds(self):
+        self.add(self.other, 3)
+        self.client.force_authenticate(user=None)
+        self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': 4}, format='json')
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post('/api/cart/merge/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['limited'], [{'product_id': self.product.id, 'available': 2}])
+        self.assertEqual(CartItem.objects.get(user=self.user).quantity, 2)
+        self.assertEqual(StockReservation.objects.get(user=self.user).quantity, 2)
@@ -3,6 +3,7 @@ from rest_framework import views, permissions, response, status
 from django.shortcuts import get_object_or_404
 from products.models import Product
 from .models import CartItem
+from .reservations import available_stock, hold_stock
 from .utils import add_to_session_cart, get_session_cart, clear_session_cart
 
 class AddToCartView(views.APIView):
@@ -14,11 +15,16 @@ class AddToCartView(views.APIView):
         product = get_object_or_404(Product, pk=product_id)
 
         if request.user.is_authenticated:
-            item, _ = CartItem.objects.get_or_create(
-                user=request.user, product=product, defaults={"quantity": 0}
-            )
-            item.quantity += max(1, qty)
-            item.save()
+            in_cart = CartItem.objects.filter(user=request.user, product=product).values_list("quantity", flat=True).first() or 0
+            quantity = in_cart + max(1, qty)
+            # stock held by other carts does not count as available
+            available = available_stock([product], user=request.user)[product.id]
+            if available < quantity:
+                return response.Response(
+                    {"error": f"Only {available} units available."}, status=status.HTTP_400_BAD_REQUEST
+                )
+            CartItem.objects.update_or_create(user=request.user, product=product, defaults={"quantity": quantity})
+            hold_stock(request.user, {product.id: quantity})
             return response.Response({"message": "added to user cart"}, status=status.HTTP_200_OK)
         else:
             add_to_session_cart(request, product.id, qty)
@@ -48,14 +54,27 @@ class MergeCartView(views.APIView):
 
     def post(self, request):
         sc = get_session_cart(request)
-        merged = 0
-        for pid_str, qty in sc.items():
-            product = get_object_or_404(Product, pk=int(pid_str))
-            item, _ = CartItem.objects.get_or_create(
-                user=request.user, product=product, defaults={"quantity": 0}
-            )
-            item.quantity += int(qty)
-            item.save()
+        wanted = {int(pid_str): int(qty) for pid_str, qty in sc.items()}
+        products = list(Product.objects.filter(pk__in=list(wanted)))
+        if len(products) != len(wanted):
+            return response.Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # same availability rule as AddToCartView: other carts' holds are not ours to take
+        available = available_stock(products, user=request.user)
+        in_cart = dict(
+            CartItem.objects.filter(user=request.user, product_id__in=list(wanted)).values_list("product_id", "quantity")
+        )
+        merged, limited, holds = 0, [], {}
+        for product in products:
+            quantity = min(in_cart.get(product.id, 0) + wanted[product.id], available[product.id])
+            if quantity < in_cart.get(product.id, 0) + wanted[product.id]:
+                limited.append({"product_id": product.id, "available": available[product.id]})
+            if quantity <= 0:
+                continue
+            CartItem.objects.update_or_create(user=request.user, product=product, defaults={"quantity": quantity})
+            holds[product.id] = quantity
             merged += 1
+        if holds:
+            hold_stock(request.user, holds)
         clear_session_cart(request)
-        return response.Response({"merged_items": merged}, status=status.HTTP_200_OK)
+        return response.Response({"merged_items": merged, "limited": limited}, status=status.HTTP_200_OK)
@@ -63,7 +63,8 @@ INSTALLED_APPS = [
     'users',
     'reviews',
     'orders',
-    'wishlist'
+    'wishlist',
+    'coupons',
 ]
 
 MIDDLEWARE = [
@@ -108,12 +109,22 @@ CORS_ALLOW_CREDENTIALS = True  # Allow credentials (cookies, auth headers)
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
     ),
+    # Reverse proxies in front of the app. get_ident (per-IP throttles) reads
+    # X-Forwarded-For only up to this depth; 0 means REMOTE_ADDR, never the header
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
+    # users.throttling: login and register endpoints only
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "20/min",
+        "login_account": "5/min",
+        "register_ip": "10/hour",
+        "auth_endpoint": "600/min",
+    },
 }
 
 
@@ -151,6 +162,18 @@ DATABASES = {
             },
         }
    }
+
+# Cache shared by all workers (comment first pages, token versions, throttles).
+# Without REDIS_URL each process keeps its own LocMem cache, and invalidation
+# only reaches the process that made the change.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -195,5 +218,48 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.Customer'
 
+# ModelBackend with the async login's password hashing kept in users.hashing's pool
+AUTHENTICATION_BACKENDS = ["users.backends.ModelBackend"]
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
-DEFAULT_FROM_EMAIL = "no-reply@cs308.local"
\ No newline at end of file
+DEFAULT_FROM_EMAIL = "no-reply@cs308.local"
+
+# Rendered invoice PDFs (orders.utils), keyed by a hash of the invoice contents
+INVOICE_CACHE_DIR = BASE_DIR / "invoice_cache"
+INVOICE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Each worker sweeps the cache after writing this fraction of the budget
+INVOICE_CACHE_SWEEP_FRACTION = 0.05
+
+# Downstream sinks for the order event outbox (orders.outbox, relay_order_events)
+ORDER_EVENT_SINKS = {
+    "file": {
+        "BACKEND": "orders.outbox.FileSink",
+        "OPTIONS": {"path": BASE_DIR / "order_events.jsonl"},
+    },
+    "http": {
+        "BACKEND": "orders.outbox.HttpSink",
+        "OPTIONS": {"url": os.getenv("ORDER_EVENTS_URL", "http://127.0.0.1:8001/order-events/")},
+    },
+}
+
+# Access tokens carry email/is_staff/role claims so requests skip the user lookup
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "users.authentication.CustomerTokenObtainPairSerializer",
+}
+
+# Thread pool for password hashing in the async auth views (users.hashing);
+# None = one thread per CPU, queue = 4 x threads
+PASSWORD_HASH_WORKERS = None
+PASSWORD_HASH_QUEUE = None
+
+# Off switch for the login/register throttles (users.throttling), for load tests
+AUTH_THROTTLES_ENABLED = True
+
+# A user gets at most one restock / price-drop email per product and kind
+# in this window (wishlist send_wishlist_alerts)
+WISHLIST_ALERT_COOLDOWN_HOURS = 24
+
+# How long adding to the cart / starting checkout holds the stock (cart.reservations)
+CART_HOLD_MINUTES = 15
+# Most units of one product a single user can hold
+CART_HOLD_MAX_UNITS = 10
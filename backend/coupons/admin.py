@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import Coupon, CouponRedemption
+
+
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    list_display = ("code", "kind", "value", "uses_remaining", "max_uses", "per_user_limit", "expires_at", "is_active")
+    list_filter = ("kind", "is_active")
+    search_fields = ("code",)
+
+
+@admin.register(CouponRedemption)
+class CouponRedemptionAdmin(admin.ModelAdmin):
+    list_display = ("coupon", "user", "order", "amount", "created_at")
+    search_fields = ("coupon__code", "user__email")
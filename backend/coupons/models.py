@@ -0,0 +1,48 @@
+from django.db import models
+from django.conf import settings
+
+
+class Coupon(models.Model):
+    KIND_CHOICES = (
+        ('percent', 'Percentage'),
+        ('fixed', 'Fixed Amount'),
+    )
+
+    code = models.CharField(max_length=40, unique=True)  # stored upper-case
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='percent')
+    value = models.DecimalField(max_digits=10, decimal_places=2)
+
+    # None = unlimited. uses_remaining is decremented atomically at checkout.
+    max_uses = models.PositiveIntegerField(null=True, blank=True)
+    uses_remaining = models.PositiveIntegerField(null=True, blank=True)
+    per_user_limit = models.PositiveIntegerField(null=True, blank=True)
+
+    valid_from = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.code
+
+    def save(self, *args, **kwargs):
+        self.code = self.code.strip().upper()
+        if self._state.adding and self.uses_remaining is None:
+            self.uses_remaining = self.max_uses
+        super().save(*args, **kwargs)
+
+
+class CouponRedemption(models.Model):
+    coupon = models.ForeignKey(Coupon, on_delete=models.CASCADE, related_name="redemptions")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="coupon_redemptions")
+    # SET_NULL: the redemption still counts against the limits after the order is
+    # archived; ArchivedOrder.coupon_redemption keeps the link for restore_orders
+    order = models.ForeignKey('orders.Order', on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['coupon', 'user'])]
+
+    def __str__(self):
+        return f"{self.coupon} by {self.user} ({self.amount})"
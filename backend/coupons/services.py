@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Coupon, CouponRedemption
+
+
+class CouponError(Exception):
+    pass
+
+
+def get_valid_coupon(code, user):
+    """
+    Read-only checks done before the checkout transaction starts: one lookup
+    on the unique code index and, if needed, one indexed count of the user's
+    redemptions.
+    """
+    coupon = Coupon.objects.filter(code=code.strip().upper(), is_active=True).first()
+    if coupon is None:
+        raise CouponError("Invalid coupon code.")
+
+    now = timezone.now()
+    if coupon.valid_from and now < coupon.valid_from:
+        raise CouponError("This coupon is not active yet.")
+    if coupon.expires_at and now >= coupon.expires_at:
+        raise CouponError("This coupon has expired.")
+    if coupon.uses_remaining == 0:
+        raise CouponError("This coupon has been fully redeemed.")
+    if coupon.per_user_limit is not None and _user_redemptions(coupon, user) >= coupon.per_user_limit:
+        raise CouponError("You have already used this coupon.")
+    return coupon
+
+
+def coupon_discount(coupon, subtotal):
+    if coupon.kind == "percent":
+        amount = subtotal * min(coupon.value, Decimal("100")) / Decimal("100")
+    else:
+        amount = coupon.value
+    return min(amount, subtotal).quantize(Decimal("0.01"))
+
+
+def redeem_coupon(coupon, user, order, subtotal):
+    """
+    Claims one use of the coupon for this order. Must run inside the checkout
+    transaction, as late as possible: the conditional decrement row-locks the
+    coupon until commit, so keeping it last keeps popular codes flowing.
+    Returns the discount amount.
+    """
+    if coupon.per_user_limit is not None:
+        # serialize this user's checkouts so two tabs cannot both pass the limit
+        get_user_model().objects.select_for_update().filter(pk=user.pk).first()
+        if _user_redemptions(coupon, user) >= coupon.per_user_limit:
+            raise CouponError("You have already used this coupon.")
+
+    if coupon.uses_remaining is not None:
+        claimed = Coupon.objects.filter(pk=coupon.pk, uses_remaining__gt=0).update(
+            uses_remaining=F("uses_remaining") - 1
+        )
+        if not claimed:
+            raise CouponError("This coupon has been fully redeemed.")
+
+    amount = coupon_discount(coupon, subtotal)
+    CouponRedemption.objects.create(coupon=coupon, user=user, order=order, amount=amount)
+    return amount
+
+
+def _user_redemptions(coupon, user):
+    return CouponRedemption.objects.filter(coupon=coupon, user=user).count()
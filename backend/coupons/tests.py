@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from cart.models import CartItem
+from orders.models import Order
+from products.models import Product
+from .models import Coupon, CouponRedemption
+
+Customer = get_user_model()
+
+
+class CouponCheckoutTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='coupon@example.com',
+            username='couponuser',
+            password='pass123'
+        )
+        self.other = Customer.objects.create_user(
+            email='coupon2@example.com',
+            username='couponuser2',
+            password='pass123'
+        )
+        self.product = Product.objects.create(name='Coupon Product', price=Decimal('100.00'), stock=50)
+
+    def checkout(self, user, code):
+        CartItem.objects.create(user=user, product=self.product, quantity=1)
+        self.client.force_authenticate(user=user)
+        return self.client.post('/api/orders/checkout/', {'coupon_code': code}, format='json')
+
+    def test_percent_coupon_discounts_order(self):
+        Coupon.objects.create(code='save10', kind='percent', value=Decimal('10'))
+
+        response = self.checkout(self.user, 'SAVE10')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get(user=self.user).total_price, Decimal('90.00'))
+
+    def test_max_uses_is_never_exceeded(self):
+        coupon = Coupon.objects.create(code='ONCE', kind='fixed', value=Decimal('5'), max_uses=1)
+
+        first = self.checkout(self.user, 'ONCE')
+        second = self.checkout(self.other, 'ONCE')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.uses_remaining, 0)
+        self.assertEqual(CouponRedemption.objects.filter(coupon=coupon).count(), 1)
+
+    def test_per_user_limit(self):
+        coupon = Coupon.objects.create(code='PERUSER', kind='fixed', value=Decimal('5'), per_user_limit=1)
+
+        self.assertEqual(self.checkout(self.user, 'PERUSER').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.checkout(self.user, 'PERUSER').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.checkout(self.other, 'PERUSER').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(CouponRedemption.objects.filter(coupon=coupon).count(), 2)
+
+    def test_rejected_coupon_leaves_stock_and_cart(self):
+        response = self.checkout(self.user, 'NOPE')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 50)
+        self.assertTrue(CartItem.objects.filter(user=self.user).exists())
+        self.assertFalse(Order.objects.filter(user=self.user).exists())
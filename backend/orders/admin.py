@@ -1,12 +1,37 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderEvent, ArchivedOrder, DiscountCampaign
 
 from .models import Order, OrderItem
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "status", "total_price", "created_at", "delivered_at")
+    list_display = ("id", "user", "status", "total_price", "discounted_total", "created_at", "delivered_at")
     list_filter = ("status",)
 
 
 # Register your models here.
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "order_id", "event_type", "created_at")
+    list_filter = ("event_type",)
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "total_price", "discounted_total", "created_at", "archived_at")
+    list_filter = ("status",)
+    search_fields = ("=id", "user__email")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DiscountCampaign)
+class DiscountCampaignAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "discount_percentage", "affected_orders", "created_by", "created_at")
+    readonly_fields = ("name", "created_by", "discount_percentage", "filters", "affected_orders", "created_at")
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Q, Subquery
+from django.utils import timezone
+
+from coupons.models import CouponRedemption
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+RETURN_WINDOW_DAYS = 30
+
+# Columns copied between the hot and archive tables (archived_at and
+# coupon_redemption are archive-only, generated columns are recomputed by the database)
+ORDER_COLUMNS = [
+    f.attname for f in ArchivedOrder._meta.concrete_fields
+    if f.attname not in ("archived_at", "coupon_redemption_id") and not f.generated
+]
+ITEM_COLUMNS = [f.attname for f in ArchivedOrderItem._meta.concrete_fields]
+
+
+def archivable_orders(months, now=None):
+    """Orders that can no longer change and are old enough to leave the hot tables."""
+    now = now or timezone.now()
+    return_window_end = now - timedelta(days=RETURN_WINDOW_DAYS)
+    return Order.objects.filter(
+        Q(status="delivered", delivered_at__lt=return_window_end)
+        # delivered before delivered_at was recorded: the last update is no
+        # earlier than the delivery, so it bounds the return window safely
+        | Q(status="delivered", delivered_at__isnull=True, updated_at__lt=return_window_end)
+        | Q(status__in=["cancelled", "returned"], updated_at__lt=now - timedelta(days=30 * months))
+    )
+
+
+def archive_orders(order_ids):
+    """Moves the given orders (and their items) to the archive tables in one transaction."""
+    with transaction.atomic():
+        orders = list(Order.objects.select_for_update().filter(id__in=order_ids).values(*ORDER_COLUMNS))
+        if not orders:
+            return 0
+        ids = [row["id"] for row in orders]
+        items = list(OrderItem.objects.filter(order_id__in=ids).values(*ITEM_COLUMNS))
+        redemptions = dict(CouponRedemption.objects.filter(order_id__in=ids).values_list("order_id", "id"))
+
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(**row, coupon_redemption_id=redemptions.get(row["id"])) for row in orders
+        ])
+        ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**row) for row in items])
+
+        OrderItem.objects.filter(order_id__in=ids).delete()
+        Order.objects.filter(id__in=ids).delete()
+    return len(orders)
+
+
+def restore_orders(order_ids):
+    """Moves archived orders back into orders_order / orders_orderitem."""
+    with transaction.atomic():
+        orders = list(ArchivedOrder.objects.select_for_update().filter(id__in=order_ids).values(*ORDER_COLUMNS))
+        if not orders:
+            return 0
+        ids = [row["id"] for row in orders]
+        items = list(ArchivedOrderItem.objects.filter(order_id__in=ids).values(*ITEM_COLUMNS))
+
+        Order.objects.bulk_create([Order(**row) for row in orders])
+        OrderItem.objects.bulk_create([OrderItem(**row) for row in items])
+
+        # auto_now/auto_now_add overwrote the timestamps on insert; put the originals back
+        archived = ArchivedOrder.objects.filter(id=OuterRef("id"))
+        Order.objects.filter(id__in=ids).update(
+            created_at=Subquery(archived.values("created_at")[:1]),
+            updated_at=Subquery(archived.values("updated_at")[:1]),
+        )
+        # and re-link the coupon redemptions that lost their order on archiving
+        CouponRedemption.objects.filter(
+            id__in=ArchivedOrder.objects.filter(id__in=ids).values("coupon_redemption_id")
+        ).update(
+            order_id=Subquery(ArchivedOrder.objects.filter(coupon_redemption_id=OuterRef("id")).values("id")[:1])
+        )
+
+        ArchivedOrderItem.objects.filter(order_id__in=ids).delete()
+        ArchivedOrder.objects.filter(id__in=ids).delete()
+    return len(orders)
+
+
+def order_history(user):
+    """A user's orders from both tables, newest first. Archived ones carry archived=True."""
+    hot = list(
+        Order.objects.filter(user=user).prefetch_related(
+            Prefetch("items", queryset=OrderItem.objects.select_related("product"))
+        )
+    )
+    cold = list(
+        ArchivedOrder.objects.filter(user=user).prefetch_related(
+            Prefetch("items", queryset=ArchivedOrderItem.objects.select_related("product"))
+        )
+    )
+    return sorted(hot + cold, key=lambda order: order.created_at, reverse=True)
+
+
+def find_order(pk, user=None):
+    """Looks an order up in the hot table first, then in the archive."""
+    for model in (Order, ArchivedOrder):
+        queryset = model.objects.filter(pk=pk)
+        if user is not None:
+            queryset = queryset.filter(user=user)
+        order = queryset.prefetch_related("items__product").first()
+        if order is not None:
+            return order
+    return None
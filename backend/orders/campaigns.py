@@ -0,0 +1,97 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import DiscountCampaign, Order, OrderItem
+
+FILTER_KEYS = ("status", "created_from", "created_to", "product_id")
+
+# Orders that are still to be paid for or adjusted. Delivered, cancelled and
+# returned orders (or ones on their way back) are never discounted.
+DISCOUNTABLE_STATUSES = ("processing", "in-transit")
+
+
+class CampaignError(ValueError):
+    pass
+
+
+def parse_discount(value):
+    # same 0-90 rule as ApplyDiscountView
+    try:
+        discount = Decimal(str(value))
+    except (InvalidOperation, TypeError):
+        raise CampaignError("discount_percentage must be a number.")
+    if not discount.is_finite():  # NaN would make the comparisons below raise
+        raise CampaignError("discount_percentage must be a number.")
+    if discount < 0 or discount > 90:
+        raise CampaignError("Discount must be between 0 and 90.")
+    return discount
+
+
+def campaign_queryset(filters):
+    """
+    Orders matched by a filter spec such as
+    {"status": "processing", "created_from": "2025-12-01", "created_to": "2025-12-31", "product_id": 7},
+    always limited to DISCOUNTABLE_STATUSES.
+    """
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise CampaignError(f"Unknown filters: {sorted(unknown)}. Allowed: {list(FILTER_KEYS)}")
+    if not filters:
+        raise CampaignError("At least one filter is required.")
+
+    queryset = Order.objects.filter(status__in=DISCOUNTABLE_STATUSES)
+
+    if "status" in filters:
+        if filters["status"] not in DISCOUNTABLE_STATUSES:
+            raise CampaignError(f"Invalid status. Must be one of: {list(DISCOUNTABLE_STATUSES)}")
+        queryset = queryset.filter(status=filters["status"])
+
+    for key, lookup in (("created_from", "created_at__date__gte"), ("created_to", "created_at__date__lte")):
+        if key in filters:
+            try:
+                day = parse_date(str(filters[key]))
+            except ValueError:
+                day = None
+            if day is None:
+                raise CampaignError(f"{key} must be YYYY-MM-DD.")
+            queryset = queryset.filter(**{lookup: day})
+
+    if "product_id" in filters:
+        try:
+            product_id = int(filters["product_id"])
+        except (TypeError, ValueError):
+            raise CampaignError("product_id must be an integer.")
+        # subquery rather than a join, so the UPDATE touches each order once
+        queryset = queryset.filter(
+            id__in=OrderItem.objects.filter(product_id=product_id).values("order_id")
+        )
+
+    return queryset
+
+
+def preview_campaign(filters):
+    return campaign_queryset(filters).count()
+
+
+def apply_campaign(filters, discount, user=None, name=""):
+    """Applies the discount to every matching order with one UPDATE and records the campaign."""
+    discount = parse_discount(discount)
+    queryset = campaign_queryset(filters)
+
+    with transaction.atomic():
+        campaign = DiscountCampaign.objects.create(
+            name=name,
+            created_by=user,
+            discount_percentage=discount,
+            filters=filters,
+        )
+        campaign.affected_orders = queryset.update(
+            discount_percentage=discount,
+            discount_campaign=campaign,
+            updated_at=timezone.now(),
+        )
+        campaign.save(update_fields=["affected_orders"])
+    return campaign
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.campaigns import CampaignError, apply_campaign, preview_campaign
+
+
+class Command(BaseCommand):
+    help = "Apply a percentage discount to every order matching the filters in one UPDATE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--discount", help="Discount percentage (0-90).")
+        parser.add_argument("--status")
+        parser.add_argument("--created-from", help="YYYY-MM-DD")
+        parser.add_argument("--created-to", help="YYYY-MM-DD")
+        parser.add_argument("--product-id", type=int, help="Only orders containing this product.")
+        parser.add_argument("--name", default="")
+        parser.add_argument("--dry-run", action="store_true", help="Only print how many orders match.")
+
+    def handle(self, *args, **options):
+        filters = {
+            key: options[key]
+            for key in ("status", "created_from", "created_to", "product_id")
+            if options[key] is not None
+        }
+        try:
+            if options["dry_run"]:
+                self.stdout.write(f"{preview_campaign(filters)} orders match {filters}.")
+                return
+            if options["discount"] is None:
+                raise CommandError("--discount is required unless --dry-run is given.")
+            campaign = apply_campaign(filters, options["discount"], name=options["name"])
+        except CampaignError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Campaign #{campaign.id}: %{campaign.discount_percentage} applied to {campaign.affected_orders} orders."
+        ))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.archive import archivable_orders, archive_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Move finished orders out of the hot tables: delivered orders past the return "
+        "window, and cancelled/returned orders older than --months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=6,
+                            help="Age (by last update) before cancelled/returned orders are archived.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--limit", type=int, help="Stop after archiving this many orders.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many orders qualify.")
+
+    def handle(self, *args, **options):
+        candidates = archivable_orders(options["months"])
+        if options["dry_run"]:
+            self.stdout.write(f"{candidates.count()} orders would be archived.")
+            return
+
+        archived = 0
+        started = time.monotonic()
+        while options["limit"] is None or archived < options["limit"]:
+            size = options["batch_size"]
+            if options["limit"] is not None:
+                size = min(size, options["limit"] - archived)
+            # re-query each round: archived rows are gone from the hot table
+            ids = list(candidates.order_by("id").values_list("id", flat=True)[:size])
+            if not ids:
+                break
+            archived += archive_orders(ids)
+            self.stdout.write(f"archived {archived} orders ({time.monotonic() - started:.0f}s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {archived} orders archived."))
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Prefetch
+
+from orders.models import Order, OrderItem
+from orders.utils import evict_invoice_cache, get_cached_invoice, invoice_snapshot, with_invoice_coupon
+
+
+def _init_worker():
+    # Needed when the pool uses "spawn" (macOS/Windows); a no-op after fork.
+    django.setup()
+
+
+def _render(snapshot):
+    # Eviction scans the whole cache, so the parent runs it once per chunk instead.
+    path, _ = get_cached_invoice(snapshot=snapshot, evict=False)
+    return snapshot["id"], snapshot["email"], str(path)
+
+
+class Command(BaseCommand):
+    help = (
+        "Render invoices for many orders in a process pool and optionally email them "
+        "in batches over one SMTP connection. Progress is checkpointed so an "
+        "interrupted run continues where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only orders created on/after this date (YYYY-MM-DD).")
+        parser.add_argument("--until", help="Only orders created before this date (YYYY-MM-DD).")
+        parser.add_argument("--status", action="append", help="Limit to this status (repeatable).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=500, help="Orders read and rendered per round.")
+        parser.add_argument("--send-email", action="store_true", help="Email each invoice to the customer.")
+        parser.add_argument("--email-batch", type=int, default=100, help="Messages per send_messages() call.")
+        parser.add_argument(
+            "--state-file",
+            default=str(Path(settings.BASE_DIR) / ".generate_invoices.state.json"),
+            help="Checkpoint file holding the last finished order id.",
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over.")
+
+    def handle(self, *args, **options):
+        state_file = Path(options["state_file"])
+        last_id = 0 if options["restart"] else self._load_checkpoint(state_file)
+        if last_id:
+            self.stdout.write(f"Resuming after order #{last_id}")
+
+        queryset = self._build_queryset(options, last_id)
+        total = queryset.count()
+        self.stdout.write(f"{total} orders to process with {options['workers']} workers")
+        if not total:
+            return
+
+        orders = (
+            with_invoice_coupon(queryset.select_related("user"))
+            .prefetch_related(
+                Prefetch("items", queryset=OrderItem.objects.select_related("product").order_by("id"))
+            )
+            .iterator(chunk_size=options["chunk_size"])
+        )
+
+        connection = get_connection() if options["send_email"] else None
+        done = sent = 0
+        started = time.monotonic()
+
+        # Forked workers must not inherit the parent's open DB connection. The pool
+        # forks on its first task and `orders` only connects when first read, so
+        # close what count() opened and start the workers before reading.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker) as pool:
+            pool.submit(os.getpid).result()
+            if connection is not None:
+                connection.open()
+            try:
+                while True:
+                    chunk = [invoice_snapshot(order) for order in islice(orders, options["chunk_size"])]
+                    if not chunk:
+                        break
+
+                    rendered = list(pool.map(_render, chunk))
+
+                    if connection is None:
+                        self._save_checkpoint(state_file, rendered[-1][0])
+                    else:
+                        for start in range(0, len(rendered), options["email_batch"]):
+                            batch = rendered[start:start + options["email_batch"]]
+                            sent += connection.send_messages(
+                                [self._build_email(order_id, email, path) for order_id, email, path in batch if email]
+                            ) or 0
+                            self._save_checkpoint(state_file, batch[-1][0])
+
+                    evict_invoice_cache()
+                    done += len(rendered)
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f"{done}/{total} rendered, {sent} emailed "
+                        f"({done / max(elapsed, 1e-6):.1f} orders/s, {elapsed:.0f}s elapsed)"
+                    )
+            finally:
+                if connection is not None:
+                    connection.close()
+
+        state_file.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(f"Done: {done} invoices, {sent} emails sent."))
+
+    def _build_queryset(self, options, last_id):
+        queryset = Order.objects.filter(id__gt=last_id).order_by("id")
+        for option, lookup in (("since", "created_at__date__gte"), ("until", "created_at__date__lt")):
+            if options[option]:
+                try:
+                    value = datetime.strptime(options[option], "%Y-%m-%d").date()
+                except ValueError:
+                    raise CommandError(f"--{option} must be YYYY-MM-DD")
+                queryset = queryset.filter(**{lookup: value})
+        if options["status"]:
+            queryset = queryset.filter(status__in=options["status"])
+        return queryset
+
+    def _build_email(self, order_id, email, path):
+        message = EmailMessage(
+            subject=f"Invoice for Order #{order_id}",
+            body="Thank you for your purchase. Your invoice is attached.",
+            to=[email],
+        )
+        message.attach(
+            filename=f"invoice_{order_id}.pdf",
+            content=Path(path).read_bytes(),
+            mimetype="application/pdf",
+        )
+        return message
+
+    def _load_checkpoint(self, state_file):
+        try:
+            return int(json.loads(state_file.read_text())["last_id"])
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError, TypeError):
+            raise CommandError(f"Unreadable checkpoint {state_file}; rerun with --restart.")
+
+    def _save_checkpoint(self, state_file, last_id):
+        tmp = state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"last_id": last_id}))
+        os.replace(tmp, state_file)
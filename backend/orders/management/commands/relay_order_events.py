@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.outbox import get_sink, relay_batch
+
+
+class Command(BaseCommand):
+    help = "Tail the order event outbox by id and deliver new events to a sink from ORDER_EVENT_SINKS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sink", default="file", help="Name of the sink in settings.ORDER_EVENT_SINKS.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--settle-seconds", type=float, default=1.0,
+                            help="Leave events younger than this for the next pass.")
+        parser.add_argument("--gap-seconds", type=float, default=300.0,
+                            help="Stop waiting for a skipped id after this long (its transaction rolled back).")
+        parser.add_argument("--max-gaps", type=int, default=10000,
+                            help="Skipped ids to keep waiting for at most; the oldest are dropped first.")
+        parser.add_argument("--follow", action="store_true", help="Keep polling instead of exiting when caught up.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when caught up (--follow).")
+
+    def handle(self, *args, **options):
+        sink = get_sink(options["sink"])
+        delivered = 0
+
+        while True:
+            count = relay_batch(
+                options["sink"], sink,
+                batch_size=options["batch_size"],
+                settle_seconds=options["settle_seconds"],
+                gap_seconds=options["gap_seconds"],
+                max_gaps=options["max_gaps"],
+            )
+            delivered += count
+            if count:
+                self.stdout.write(f"{options['sink']}: delivered {count} events ({delivered} total)")
+            elif options["follow"]:
+                time.sleep(options["interval"])
+            else:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"{options['sink']}: caught up, {delivered} events delivered."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.archive import restore_orders
+from orders.models import ArchivedOrder
+
+
+class Command(BaseCommand):
+    help = "Move archived orders back into the hot order tables (reverse of archive_orders)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("order_ids", nargs="*", type=int, help="Archived order ids to restore.")
+        parser.add_argument("--user", type=int, help="Restore every archived order of this user id.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not options["order_ids"] and options["user"] is None:
+            raise CommandError("Give order ids or --user.")
+
+        queryset = ArchivedOrder.objects.order_by("id")
+        if options["order_ids"]:
+            queryset = queryset.filter(id__in=options["order_ids"])
+        if options["user"] is not None:
+            queryset = queryset.filter(user_id=options["user"])
+
+        restored = 0
+        while True:
+            ids = list(queryset.values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            restored += restore_orders(ids)
+            self.stdout.write(f"restored {restored} orders")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {restored} orders restored."))
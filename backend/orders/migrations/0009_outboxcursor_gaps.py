@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_discountcampaign'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxcursor',
+            name='gaps',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,9 +1,18 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from products.models import Product
 from decimal import Decimal
 
 
+# total_price minus the percentage discount, computed by the database so it can
+# be sorted, filtered and summed in SQL
+DISCOUNTED_TOTAL = models.ExpressionWrapper(
+    models.F("total_price") - models.F("total_price") * models.F("discount_percentage") / models.Value(100),
+    output_field=models.DecimalField(max_digits=10, decimal_places=2),
+)
+
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('processing', 'Processing'),
@@ -14,6 +23,14 @@ class Order(models.Model):
         ('returned', 'Returned'),
     )
 
+    # status -> statuses it may move to (used by the bulk back-office endpoint)
+    ALLOWED_TRANSITIONS = {
+        'processing': ('in-transit', 'cancelled'),
+        'in-transit': ('delivered',),
+        'delivered': ('return_requested',),
+        'return_requested': ('returned', 'delivered'),
+    }
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -40,16 +57,37 @@ class Order(models.Model):
         default=0
     )
 
+    discounted_total = models.GeneratedField(
+        expression=DISCOUNTED_TOTAL,
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     delivered_at = models.DateTimeField(null=True, blank=True)  # 30-day return policy
 
+    # set when the discount came from a bulk campaign rather than ApplyDiscountView
+    discount_campaign = models.ForeignKey(
+        'DiscountCampaign',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="orders"
+    )
+
     class Meta:
         ordering = ['-created_at']
 
     def __str__(self):
         return f"Order #{self.id} - {self.user} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The database recomputes discounted_total; drop the cached value so the
+        # next access reloads it instead of returning the pre-save amount.
+        self.__dict__.pop("discounted_total", None)
+
     
     def discounted_total_price(self):
         discount_amount = (self.total_price * self.discount_percentage) / Decimal("100")
@@ -71,3 +109,134 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.order.id} - {self.product.name} x {self.quantity}"
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only outbox of order changes. Rows are written in the same
+    transaction as the change and relayed to downstream sinks by the
+    relay_order_events command, so consumers never poll orders_order.
+    """
+    EVENT_CHOICES = (
+        ('created', 'Created'),
+        ('status_changed', 'Status Changed'),
+    )
+
+    # plain id, not a FK: events must outlive the order row
+    order_id = models.BigIntegerField(db_index=True)
+    event_type = models.CharField(max_length=30, choices=EVENT_CHOICES)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Event #{self.id} {self.event_type} for order #{self.order_id}"
+
+
+class OutboxCursor(models.Model):
+    """Last OrderEvent id delivered to each sink."""
+    sink = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    # ids below last_event_id not seen yet (uncommitted when the cursor passed): {id: first seen, epoch secs}
+    gaps = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.sink} @ {self.last_event_id}"
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold copy of an Order that can no longer change (delivered past the
+    return window, or cancelled/returned long ago). Keeps the original id so
+    it can be moved back by restore_orders.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="archived_orders"
+    )
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    discount_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    discounted_total = models.GeneratedField(
+        expression=DISCOUNTED_TOTAL,
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    discount_campaign = models.ForeignKey(
+        'DiscountCampaign',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    # CouponRedemption.order is SET_NULL, so the link is lost when the order
+    # leaves orders_order; kept here for restore_orders to put back
+    coupon_redemption = models.ForeignKey(
+        'coupons.CouponRedemption',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'])]
+
+    def __str__(self):
+        return f"Archived order #{self.id} - {self.user} ({self.status})"
+
+    def discounted_total_price(self):
+        discount_amount = (self.total_price * self.discount_percentage) / Decimal("100")
+        return self.total_price - discount_amount
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name="items"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.order_id} - {self.product_id} x {self.quantity}"
+
+
+class DiscountCampaign(models.Model):
+    """Audit record of one set-based discount run (see orders.campaigns)."""
+    name = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    discount_percentage = models.DecimalField(max_digits=5, decimal_places=2)
+    filters = models.JSONField(default=dict)
+    affected_orders = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Campaign #{self.id} {self.name} (%{self.discount_percentage}, {self.affected_orders} orders)"
@@ -0,0 +1,142 @@
+import json
+import time
+import urllib.request
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OrderEvent, OutboxCursor
+
+
+def record_order_event(order, event_type, **payload):
+    """Appends an outbox row. Call inside the transaction that changes the order."""
+    payload.setdefault("status", order.status)
+    payload.setdefault("user_id", order.user_id)
+    return OrderEvent.objects.create(order_id=order.id, event_type=event_type, payload=payload)
+
+
+def record_status_change(order, old_status):
+    return record_order_event(order, "status_changed", old_status=old_status, new_status=order.status)
+
+
+def record_bulk_status_change(moved, new_status):
+    """moved: {order_id: (old_status, user_id)} for every order that was updated."""
+    return OrderEvent.objects.bulk_create([
+        OrderEvent(
+            order_id=order_id,
+            event_type="status_changed",
+            payload={
+                "old_status": old_status,
+                "new_status": new_status,
+                "status": new_status,
+                "user_id": user_id,
+            },
+        )
+        for order_id, (old_status, user_id) in moved.items()
+    ])
+
+
+def event_as_dict(event):
+    return {
+        "id": event.id,
+        "order_id": event.order_id,
+        "event_type": event.event_type,
+        "payload": event.payload,
+        "created_at": event.created_at,
+    }
+
+
+class FileSink:
+    """Appends events to a JSON-lines file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def send(self, events):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event_as_dict(event), cls=DjangoJSONEncoder) + "\n")
+
+
+class HttpSink:
+    """POSTs each batch as a JSON array; any non-2xx answer fails the batch."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps([event_as_dict(e) for e in events], cls=DjangoJSONEncoder).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise RuntimeError(f"{self.url} answered {response.status}")
+
+
+def get_sink(name):
+    sinks = getattr(settings, "ORDER_EVENT_SINKS", {})
+    if name not in sinks:
+        raise ImproperlyConfigured(f"Unknown order event sink '{name}'. Configured: {list(sinks)}")
+    config = sinks[name]
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def relay_batch(sink_name, sink, batch_size=500, settle_seconds=1, gap_seconds=300, max_gaps=10000):
+    """
+    Delivers the next batch of events after the sink's cursor and advances it.
+    Delivery is at-least-once: if the sink fails, the cursor does not move.
+
+    Ids are handed out before commit, so a slow transaction can commit an id
+    lower than one already relayed. Every id the cursor skips is kept in
+    cursor.gaps and looked up again on later passes, until it shows up or is
+    gap_seconds old (its transaction rolled back). At most max_gaps are kept,
+    newest first: a sequence jump (e.g. after a failover) skips ids that will
+    never commit and must not blow up the cursor row. The sink is called
+    outside any transaction; the cursor is then moved with a conditional
+    UPDATE, so a concurrent relay at worst sends a batch twice.
+    """
+    cursor, _ = OutboxCursor.objects.get_or_create(sink=sink_name)
+    now = time.time()
+    gaps = {int(event_id): seen for event_id, seen in cursor.gaps.items() if now - seen < gap_seconds}
+
+    late = list(OrderEvent.objects.filter(id__in=list(gaps)).order_by("id")[:batch_size]) if gaps else []
+    fresh = list(
+        OrderEvent.objects.filter(
+            id__gt=cursor.last_event_id,
+            created_at__lte=timezone.now() - timedelta(seconds=settle_seconds),
+        ).order_by("id")[:batch_size]
+    )
+    events = late + fresh
+    if not events:
+        return 0
+
+    sink.send(events)
+
+    for event in late:
+        gaps.pop(event.id, None)
+    last_event_id = cursor.last_event_id
+    if fresh:
+        seen = {event.id for event in fresh}
+        # only the max_gaps ids just below the new cursor can survive the trim below
+        first = max(last_event_id + 1, fresh[-1].id - max_gaps)
+        gaps.update((event_id, now) for event_id in range(first, fresh[-1].id) if event_id not in seen)
+        last_event_id = fresh[-1].id
+    if len(gaps) > max_gaps:
+        gaps = dict(sorted(gaps.items(), key=lambda gap: (gap[1], gap[0]))[-max_gaps:])
+
+    OutboxCursor.objects.filter(
+        pk=cursor.pk, last_event_id=cursor.last_event_id, updated_at=cursor.updated_at
+    ).update(
+        last_event_id=last_event_id,
+        gaps={str(event_id): seen_at for event_id, seen_at in gaps.items()},
+        updated_at=timezone.now(),
+    )
+    return len(events)
@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.db.models import F, OuterRef, Subquery, Sum
+
+from products.inventory import increment_stock, stock_levels
+from products.ledger import record_order_movements
+from products.models import Product
+from wishlist.alerts import queue_back_in_stock
+from .models import OrderItem
+
+# statuses that put an order's items back on the shelf, and the ledger reason
+RESTOCK_REASONS = {"cancelled": "cancellation", "returned": "return"}
+
+
+def restore_stock(order_ids, new_status):
+    """
+    Puts every item of the given orders back in stock. Call inside the
+    transaction that moves them to new_status (a RESTOCK_REASONS key), and
+    only for orders that were not already cancelled or returned.
+
+    Unsharded products get one UPDATE ... SET stock = stock + (summed
+    quantities from orders_orderitem). Sharded products get one increment
+    per product. The ledger and the back-in-stock alerts get one bulk INSERT
+    each. Returns the units restored.
+    """
+    reason = RESTOCK_REASONS[new_status]
+    lines = list(
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .values("order_id", "product_id")
+        .annotate(quantity=Sum("quantity"))
+        .order_by()
+    )
+    if not lines:
+        return 0
+
+    items = OrderItem.objects.filter(order_id__in=order_ids)
+    # lock in id order, like checkout, and read the stock the alerts compare against
+    products = list(
+        Product.objects.select_for_update().filter(id__in=items.values("product_id"))
+        .only("id", "stock", "stock_shards").order_by("id")
+    )
+    before = stock_levels(products)
+
+    Product.objects.filter(id__in=items.values("product_id"), stock_shards=0).update(
+        stock=F("stock") + Subquery(
+            items.filter(product=OuterRef("pk")).order_by().values("product").annotate(total=Sum("quantity")).values("total")
+        )
+    )
+
+    restored = defaultdict(int)
+    for line in lines:
+        restored[line["product_id"]] += line["quantity"]
+    for product in products:
+        if product.stock_shards:
+            increment_stock(product, restored[product.id])
+
+    record_order_movements(reason, [(line["order_id"], line["product_id"], line["quantity"]) for line in lines])
+    queue_back_in_stock([product_id for product_id, quantity in restored.items() if quantity and not before[product_id]])
+    return sum(restored.values())
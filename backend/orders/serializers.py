@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Order, OrderItem
+from .models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem, DiscountCampaign
 from products.serializers import ProductSerializer
 
 
@@ -23,7 +23,12 @@ class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
 
     
-    discounted_total_price = serializers.SerializerMethodField()
+    discounted_total_price = serializers.DecimalField(
+        source="discounted_total",
+        max_digits=10,
+        decimal_places=2,
+        read_only=True
+    )
 
     class Meta:
         model = Order
@@ -47,6 +52,29 @@ class OrderSerializer(serializers.ModelSerializer):
             "discounted_total_price",
         ]
 
-    
-    def get_discounted_total_price(self, obj):
-        return obj.discounted_total_price()
+
+class ArchivedOrderItemSerializer(OrderItemSerializer):
+    class Meta(OrderItemSerializer.Meta):
+        model = ArchivedOrderItem
+
+
+class ArchivedOrderSerializer(OrderSerializer):
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        model = ArchivedOrder
+        fields = OrderSerializer.Meta.fields + ["archived_at"]
+
+
+class DiscountCampaignSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DiscountCampaign
+        fields = ["id", "name", "created_by", "discount_percentage", "filters", "affected_orders", "created_at"]
+        read_only_fields = fields
+
+
+def serialize_order(order):
+    """Serializes a hot or archived order with the same shape (plus an `archived` flag)."""
+    if isinstance(order, ArchivedOrder):
+        return {**ArchivedOrderSerializer(order).data, "archived": True}
+    return {**OrderSerializer(order).data, "archived": False}
@@ -1,3 +1,345 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from rest_framework import status
+
+from cart.models import CartItem
+from coupons.models import Coupon, CouponRedemption
+from products.inventory import current_stock, set_shard_count
+from products.models import InventoryMovement, Product
+from wishlist.models import ProductAlert
+from .archive import archivable_orders, archive_orders, restore_orders
+from .campaigns import CampaignError, campaign_queryset
+from .models import ArchivedOrder, Order, OrderEvent, OutboxCursor
+from .outbox import relay_batch
+from .utils import invoice_fingerprint, invoice_snapshot, with_invoice_coupon
+
+Customer = get_user_model()
+
+
+class RestoreStockTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='restock@example.com',
+            username='restockuser',
+            password='pass123'
+        )
+        self.admin = Customer.objects.create_user(
+            email='restockadmin@example.com',
+            username='restockadmin',
+            password='pass123',
+            is_staff=True
+        )
+        self.product = Product.objects.create(name='Restock Product', price=10, stock=5)
+
+    def checkout(self, quantity=2):
+        CartItem.objects.create(user=self.user, product=self.product, quantity=quantity)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post('/api/orders/checkout/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Order.objects.filter(user=self.user).latest('id')
+
+    def stock(self):
+        return current_stock(Product.objects.get(pk=self.product.pk))
+
+    def test_cancel_restores_stock_once(self):
+        order = self.checkout()
+        self.assertEqual(self.stock(), 3)
+
+        first = self.client.post(f'/api/orders/{order.id}/cancel/')
+        second = self.client.post(f'/api/orders/{order.id}/cancel/')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.stock(), 5)
+        self.assertEqual(
+            list(InventoryMovement.objects.filter(order_id=order.id, reason='cancellation').values_list('delta', flat=True)),
+            [2]
+        )
+
+    def test_admin_cannot_reopen_and_recancel(self):
+        order = self.checkout()
+        self.client.force_authenticate(user=self.admin)
+        url = f'/api/orders/admin/update-status/{order.id}/'
+
+        self.assertEqual(self.client.put(url, {'status': 'cancelled'}, format='json').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.put(url, {'status': 'processing'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.put(url, {'status': 'cancelled'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.stock(), 5)
+
+    def test_bulk_cancel_restores_every_order(self):
+        orders = [self.checkout(quantity=1) for _ in range(3)]
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.post(
+            '/api/orders/admin/bulk-update-status/',
+            {'order_ids': [order.id for order in orders], 'status': 'cancelled'},
+            format='json'
+        )
+        repeat = self.client.post(
+            '/api/orders/admin/bulk-update-status/',
+            {'order_ids': [order.id for order in orders], 'status': 'cancelled'},
+            format='json'
+        )
+
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(repeat.data['updated'], 0)
+        self.assertEqual(self.stock(), 5)
+
+    def test_return_restores_sharded_stock(self):
+        set_shard_count(self.product.pk, 3)
+        order = self.checkout()
+        Order.objects.filter(pk=order.pk).update(status='return_requested')
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.put(f'/api/orders/admin/update-status/{order.id}/', {'status': 'returned'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.stock(), 5)
+
+    def test_restock_from_zero_queues_alert(self):
+        order = self.checkout(quantity=5)
+        self.assertEqual(self.stock(), 0)
+
+        self.client.post(f'/api/orders/{order.id}/cancel/')
+
+        self.assertTrue(ProductAlert.objects.filter(product=self.product, kind='back_in_stock').exists())
+
+
+class InvoiceFingerprintTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='invoice@example.com',
+            username='invoiceuser',
+            password='pass123'
+        )
+        self.order = Order.objects.create(user=self.user, total_price=20)
+
+    def fingerprint(self):
+        return invoice_fingerprint(invoice_snapshot(Order.objects.get(pk=self.order.pk)))
+
+    def test_status_change_keeps_the_fingerprint(self):
+        before = self.fingerprint()
+        Order.objects.filter(pk=self.order.pk).update(status='in-transit')
+
+        self.assertEqual(self.fingerprint(), before)
+
+    def test_discount_changes_the_fingerprint(self):
+        before = self.fingerprint()
+        Order.objects.filter(pk=self.order.pk).update(discount_percentage=10)
+
+        self.assertNotEqual(self.fingerprint(), before)
+
+    def test_coupon_is_in_the_snapshot(self):
+        coupon = Coupon.objects.create(code='SAVE5', kind='fixed', value=Decimal('5'))
+        CouponRedemption.objects.create(coupon=coupon, user=self.user, order=self.order, amount=Decimal('5.00'))
+
+        snapshot = invoice_snapshot(Order.objects.get(pk=self.order.pk))
+
+        self.assertEqual(snapshot['coupon'], ['SAVE5', '5.00'])
+        annotated = with_invoice_coupon(Order.objects.filter(pk=self.order.pk)).get()
+        self.assertEqual(invoice_snapshot(annotated), snapshot)
+
+    def test_annotated_order_without_coupon(self):
+        order = with_invoice_coupon(Order.objects.select_related('user').filter(pk=self.order.pk)).get()
+
+        with self.assertNumQueries(1):  # the items, not the coupon
+            self.assertIsNone(invoice_snapshot(order)['coupon'])
+
+
+class ArchiveTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='archive@example.com',
+            username='archiveuser',
+            password='pass123'
+        )
+        self.order = Order.objects.create(user=self.user, total_price=20, status='delivered')
+        self.long_ago = timezone.now() - timedelta(days=60)
+
+    def test_coupon_redemption_is_relinked_on_restore(self):
+        coupon = Coupon.objects.create(code='KEEP', kind='fixed', value=Decimal('5'))
+        redemption = CouponRedemption.objects.create(
+            coupon=coupon, user=self.user, order=self.order, amount=Decimal('5.00')
+        )
+
+        archive_orders([self.order.id])
+        redemption.refresh_from_db()
+        self.assertIsNone(redemption.order_id)
+        self.assertEqual(ArchivedOrder.objects.get(pk=self.order.id).coupon_redemption_id, redemption.id)
+
+        restore_orders([self.order.id])
+        redemption.refresh_from_db()
+        self.assertEqual(redemption.order_id, self.order.id)
+
+    def test_delivered_without_delivered_at_falls_back_to_updated_at(self):
+        recent = Order.objects.create(user=self.user, total_price=20, status='delivered')
+        Order.objects.filter(pk=self.order.pk).update(updated_at=self.long_ago)
+
+        self.assertEqual(list(archivable_orders(6).values_list('id', flat=True)), [self.order.id])
+        self.assertFalse(archivable_orders(6).filter(pk=recent.pk).exists())
+
+
+class CampaignFilterTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='campaign@example.com',
+            username='campaignuser',
+            password='pass123'
+        )
+        self.orders = {
+            choice: Order.objects.create(user=self.user, total_price=20, status=choice)
+            for choice, _ in Order.STATUS_CHOICES
+        }
+
+    def test_only_open_orders_match_by_default(self):
+        today = timezone.localdate().isoformat()
+
+        matched = set(campaign_queryset({'created_from': today}).values_list('status', flat=True))
+
+        self.assertEqual(matched, {'processing', 'in-transit'})
+
+    def test_closed_status_filter_is_rejected(self):
+        for closed in ('delivered', 'cancelled', 'return_requested', 'returned'):
+            with self.assertRaises(CampaignError):
+                campaign_queryset({'status': closed})
+
+
+class BulkStatusTest(APITestCase):
+    url = '/api/orders/admin/bulk-update-status/'
+
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='bulk@example.com',
+            username='bulkuser',
+            password='pass123'
+        )
+        self.admin = Customer.objects.create_user(
+            email='bulkadmin@example.com',
+            username='bulkadmin',
+            password='pass123',
+            is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def order(self, order_status, **fields):
+        return Order.objects.create(user=self.user, total_price=20, status=order_status, **fields)
+
+    def test_mixed_batch(self):
+        shipped = self.order('in-transit')
+        delivered_at = timezone.now() - timedelta(days=3)
+        disputed = self.order('return_requested', delivered_at=delivered_at)
+        waiting = self.order('processing')
+
+        response = self.client.post(
+            self.url, {'order_ids': [shipped.id, str(disputed.id), waiting.id, 999999], 'status': 'delivered'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(
+            [(result['order_id'], result['result']) for result in response.data['results']],
+            [(shipped.id, 'updated'), (disputed.id, 'updated'), (waiting.id, 'invalid_transition'),
+             (999999, 'not_found')]
+        )
+        shipped.refresh_from_db()
+        disputed.refresh_from_db()
+        waiting.refresh_from_db()
+        self.assertEqual(shipped.status, 'delivered')
+        self.assertIsNotNone(shipped.delivered_at)
+        # a rejected return keeps its original delivery date
+        self.assertEqual(disputed.delivered_at, delivered_at)
+        self.assertEqual(waiting.status, 'processing')
+
+    def test_non_integer_ids_are_rejected(self):
+        order = self.order('processing')
+
+        for bad in (True, 1.9, ' 7', '1e3', None):
+            response = self.client.post(
+                self.url, {'order_ids': [order.id, bad], 'status': 'cancelled'}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'processing')
+
+
+class ListSink:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, events):
+        self.sent.extend(event.id for event in events)
+
+
+class FailingSink:
+    def send(self, events):
+        raise RuntimeError("sink is down")
+
+
+class RelayTest(APITestCase):
+    def event(self, **fields):
+        return OrderEvent.objects.create(order_id=1, event_type='created', **fields)
+
+    def relay(self, sink, **options):
+        return relay_batch('test', sink, settle_seconds=0, **options)
+
+    def cursor(self):
+        return OutboxCursor.objects.get(sink='test')
+
+    def test_delivers_in_order_and_advances(self):
+        events = [self.event() for _ in range(3)]
+        sink = ListSink()
+
+        self.assertEqual(self.relay(sink), 3)
+        self.assertEqual(self.relay(sink), 0)
+
+        self.assertEqual(sink.sent, [event.id for event in events])
+        self.assertEqual(self.cursor().last_event_id, events[-1].id)
+
+    def test_failed_send_keeps_the_cursor(self):
+        self.event()
+
+        with self.assertRaises(RuntimeError):
+            self.relay(FailingSink())
+
+        self.assertEqual(self.cursor().last_event_id, 0)
+
+    def test_late_commit_is_delivered_from_the_gaps(self):
+        first, late, last = self.event(), self.event(), self.event()
+        late_id = late.id
+        late.delete()  # not committed yet when the relay passes
+        sink = ListSink()
+
+        self.relay(sink)
+        self.assertEqual(set(self.cursor().gaps), {str(late_id)})
+        self.event(id=late_id)
+        self.relay(sink)
+
+        self.assertEqual(sink.sent, [first.id, last.id, late_id])
+        self.assertEqual(self.cursor().gaps, {})
+
+    def test_expired_gaps_are_dropped(self):
+        self.event()
+        skipped = self.event()
+        self.event()
+        skipped.delete()
+        self.relay(ListSink())
+
+        self.event()
+        self.relay(ListSink(), gap_seconds=0)
+
+        self.assertEqual(self.cursor().gaps, {})
+
+    def test_gaps_are_capped_after_a_sequence_jump(self):
+        first = self.event()
+        jumped = self.event(id=first.id + 1_000_000)
+
+        self.relay(ListSink(), max_gaps=5)
+
+        gaps = sorted(int(event_id) for event_id in self.cursor().gaps)
+        self.assertEqual(gaps, list(range(jumped.id - 5, jumped.id)))
@@ -1,16 +1,25 @@
 from django.urls import path
 from .views import CheckoutView, OrderCancelView, OrderReturnView, admin_update_order_status,ApplyDiscountView
-from .views import SendInvoiceView
+from .views import admin_bulk_update_order_status, OrderListView, OrderDetailView
+from .views import AdminOrderListView, admin_revenue_report, DiscountCampaignView
+from .views import SendInvoiceView, InvoiceDownloadView
 
 
 urlpatterns = [
+    path('', OrderListView.as_view(), name='order-list'),
+    path('<int:pk>/', OrderDetailView.as_view(), name='order-detail'),
+    path('all/', AdminOrderListView.as_view(), name='admin-order-list'),
+    path('admin/revenue/', admin_revenue_report, name='admin-revenue'),
     path('checkout/', CheckoutView.as_view(), name='checkout'),
     path("admin/update-status/<int:order_id>/", admin_update_order_status),
+    path("admin/bulk-update-status/", admin_bulk_update_order_status, name="admin-bulk-update-status"),
     path('<int:pk>/cancel/', OrderCancelView.as_view(), name='order-cancel'),
     path('<int:pk>/return/', OrderReturnView.as_view(), name='order-return'),
     path('<int:pk>/apply-discount/', ApplyDiscountView.as_view(), name='apply-discount'),
+    path('discount-campaigns/', DiscountCampaignView.as_view(), name='discount-campaigns'),
     path("<int:pk>/send-invoice/", SendInvoiceView.as_view(), name="send-invoice"),
     path("<int:pk>/send-invoice/", SendInvoiceView.as_view(), name="send-invoice"),
+    path("<int:pk>/invoice/", InvoiceDownloadView.as_view(), name="invoice-download"),
 
 
 ]
@@ -1,26 +1,255 @@
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
-import io
+from django.conf import settings
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.db.models import OuterRef, Subquery
+
+from coupons.models import CouponRedemption
+
+# Bump when the PDF layout changes so old cached renders are not served.
+INVOICE_RENDER_VERSION = 3
+
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 72
+LINE_HEIGHT = 16
+NAME_MAX_CHARS = 60
+
+# Chunk size used when streaming a cached invoice back to the client
+INVOICE_STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def with_invoice_coupon(queryset):
+    """Annotates the coupon invoice_snapshot needs, saving a query per order."""
+    redemption = CouponRedemption.objects.filter(order_id=OuterRef("pk"))
+    return queryset.annotate(
+        coupon_code=Subquery(redemption.values("coupon__code")[:1]),
+        coupon_amount=Subquery(redemption.values("amount")[:1]),
+    )
+
+
+def invoice_snapshot(order):
+    """Everything that ends up on the invoice, as plain (picklable) data."""
+    if "items" in getattr(order, "_prefetched_objects_cache", {}):
+        items = [
+            (item.product.name, item.quantity, str(item.unit_price))
+            for item in order.items.all()
+        ]
+    else:
+        # One joined query, no model instances: B2B orders can have thousands of lines
+        items = [
+            (name, quantity, str(unit_price))
+            for name, quantity, unit_price in order.items.order_by("id").values_list(
+                "product__name", "quantity", "unit_price"
+            )
+        ]
+    if hasattr(order, "coupon_amount"):  # with_invoice_coupon
+        coupon = (order.coupon_code, order.coupon_amount) if order.coupon_code else None
+    else:
+        coupon = CouponRedemption.objects.filter(order_id=order.id).values_list("coupon__code", "amount").first()
+    # only what render_invoice_pdf draws: anything else would change the hash
+    # (and the ETag) without changing the PDF
+    return {
+        "id": order.id,
+        "email": order.user.email if order.user else "",
+        "total_price": str(order.total_price),
+        "discount_percentage": str(order.discount_percentage),
+        # .2f: a Subquery can come back from SQLite without the column's scale
+        "coupon": [coupon[0], f"{Decimal(coupon[1]):.2f}"] if coupon else None,
+        "items": items,
+    }
 
-def generate_invoice_pdf(order):
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
+
+def invoice_fingerprint(snapshot):
+    payload = json.dumps(snapshot, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(f"v{INVOICE_RENDER_VERSION}:{payload}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render_invoice_pdf(snapshot, fileobj):
+    """
+    Draws the invoice straight into fileobj (the cache file, not a BytesIO),
+    flowing item lines over as many pages as needed. ReportLab holds finished
+    pages until save(), so they are kept compressed.
+    """
+    p = canvas.Canvas(fileobj, pagesize=letter, pageCompression=1)
+    page = 1
+
+    def start_page(y):
+        p.setFont("Helvetica-Bold", 11)
+        p.drawString(MARGIN, y, "Product")
+        p.drawRightString(PAGE_WIDTH - MARGIN - 120, y, "Qty")
+        p.drawRightString(PAGE_WIDTH - MARGIN, y, "Unit Price")
+        p.line(MARGIN, y - 4, PAGE_WIDTH - MARGIN, y - 4)
+        p.setFont("Helvetica", 10)
+        return y - LINE_HEIGHT - 4
+
+    def finish_page():
+        p.setFont("Helvetica", 9)
+        p.drawRightString(PAGE_WIDTH - MARGIN, MARGIN / 2, f"Order #{snapshot['id']} - Page {page}")
+        p.showPage()
 
     p.setFont("Helvetica-Bold", 16)
-    p.drawString(100, 750, "Order Invoice")
+    p.drawString(MARGIN, PAGE_HEIGHT - MARGIN, "Order Invoice")
 
     p.setFont("Helvetica", 12)
-    p.drawString(100, 720, f"Order ID: {order.id}")
-    p.drawString(100, 700, f"User: {order.user.email}")
-    p.drawString(100, 680, f"Total Price: {order.total_price}")
+    p.drawString(MARGIN, PAGE_HEIGHT - MARGIN - 30, f"Order ID: {snapshot['id']}")
+    p.drawString(MARGIN, PAGE_HEIGHT - MARGIN - 50, f"User: {snapshot['email']}")
 
-    y = 650
-    for item in order.items.all():
-        p.drawString(100, y, f"{item.product.name} x {item.quantity} - {item.unit_price}")
-        y -= 20
+    y = start_page(PAGE_HEIGHT - MARGIN - 85)
+    for name, quantity, unit_price in snapshot["items"]:
+        if y < MARGIN:
+            finish_page()
+            page += 1
+            y = start_page(PAGE_HEIGHT - MARGIN)
+        if len(name) > NAME_MAX_CHARS:
+            name = name[:NAME_MAX_CHARS - 3] + "..."
+        p.drawString(MARGIN, y, name)
+        p.drawRightString(PAGE_WIDTH - MARGIN - 120, y, str(quantity))
+        p.drawRightString(PAGE_WIDTH - MARGIN, y, unit_price)
+        y -= LINE_HEIGHT
 
-    p.showPage()
+    total = Decimal(snapshot["total_price"])
+    discount = Decimal(snapshot["discount_percentage"])
+    totals = []
+    if snapshot["coupon"]:
+        # total_price is already net of the coupon; show how the item lines get there
+        code, amount = snapshot["coupon"]
+        totals.append(f"Subtotal: {total + Decimal(amount)}")
+        totals.append(f"Coupon {code}: -{amount}")
+    totals.append(f"Total Price: {total}")
+    if discount:
+        totals.append(f"Discount: %{discount}")
+        totals.append(f"Amount Due: {(total - total * discount / Decimal('100')).quantize(Decimal('0.01'))}")
+
+    if y - LINE_HEIGHT * len(totals) < MARGIN:
+        finish_page()
+        page += 1
+        y = PAGE_HEIGHT - MARGIN
+    p.setFont("Helvetica-Bold", 12)
+    for line in totals:
+        y -= LINE_HEIGHT
+        p.drawRightString(PAGE_WIDTH - MARGIN, y, line)
+
+    finish_page()
     p.save()
 
-    buffer.seek(0)
-    return buffer
+
+# Rendered PDFs are stored on disk under the hash of their snapshot, so any
+# change to the order produces a new file and stale renders simply age out.
+
+def invoice_cache_dir():
+    return Path(getattr(settings, "INVOICE_CACHE_DIR", settings.BASE_DIR / "invoice_cache"))
+
+
+def invoice_cache_path(fingerprint):
+    return invoice_cache_dir() / fingerprint[:2] / f"{fingerprint}.pdf"
+
+
+def get_cached_invoice(order=None, snapshot=None, evict=True):
+    """
+    Returns (path, fingerprint) of the rendered invoice, rendering it only
+    when no file exists for the current contents of the order.
+    """
+    if snapshot is None:
+        snapshot = invoice_snapshot(order)
+    fingerprint = invoice_fingerprint(snapshot)
+    path = invoice_cache_path(fingerprint)
+
+    try:
+        # mtime doubles as "last used" for eviction
+        os.utime(path)
+        return path, fingerprint
+    except FileNotFoundError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            render_invoice_pdf(snapshot, tmp)
+            size = tmp.tell()
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+    if evict:
+        _note_written(size, keep=path)
+    return path, fingerprint
+
+
+def open_cached_invoice(order=None, snapshot=None):
+    """
+    Like get_cached_invoice, but returns (open file, fingerprint). If another
+    request evicts the file between the lookup and the open, it is rendered
+    again; once open, the handle stays readable even if the file is deleted.
+    """
+    if snapshot is None:
+        snapshot = invoice_snapshot(order)
+    for _ in range(3):
+        path, fingerprint = get_cached_invoice(snapshot=snapshot)
+        try:
+            return path.open("rb"), fingerprint
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"Invoice {fingerprint} keeps being evicted; the cache budget is too small.")
+
+
+# Bytes this process has written since its last sweep. A full directory walk
+# runs once they pass INVOICE_CACHE_SWEEP_FRACTION of the budget, not on every
+# miss, so the cache can overshoot by that fraction per worker between sweeps.
+_written_since_sweep = 0
+
+
+def _note_written(size, keep=None):
+    global _written_since_sweep
+    _written_since_sweep += size
+    budget = getattr(settings, "INVOICE_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+    if _written_since_sweep >= budget * getattr(settings, "INVOICE_CACHE_SWEEP_FRACTION", 0.05):
+        _written_since_sweep = 0
+        evict_invoice_cache(keep=keep, max_bytes=budget)
+
+
+def evict_invoice_cache(keep=None, max_bytes=None):
+    """Deletes least recently used invoices until the cache fits its size budget."""
+    if max_bytes is None:
+        max_bytes = getattr(settings, "INVOICE_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+
+    entries = []
+    total = 0
+    for path in invoice_cache_dir().glob("*/*.pdf"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def generate_invoice_pdf(order):
+    invoice, _ = open_cached_invoice(order)
+    return invoice
@@ -1,19 +1,38 @@
 from rest_framework.views import APIView
+from rest_framework import generics
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils.dateparse import parse_date
 from django.utils import timezone
 from cart.models import CartItem
+from cart.reservations import available_stock, current_holds, hold_stock, release_holds, restore_holds
+from coupons.services import CouponError, get_valid_coupon, redeem_coupon
 from products.models import Product
-from .models import Order, OrderItem
-from .serializers import OrderSerializer
+from products.inventory import InsufficientStock, decrement_stock
+from products.ledger import record_movements
+from .models import Order, OrderItem, ArchivedOrder, DiscountCampaign
+from .serializers import OrderSerializer, serialize_order, DiscountCampaignSerializer
+from .campaigns import CampaignError, apply_campaign, preview_campaign
+from .archive import order_history, find_order
+from .restock import RESTOCK_REASONS, restore_stock
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
-from decimal import Decimal   
+from decimal import Decimal, InvalidOperation
 from django.core.mail import send_mail
-from .utils import generate_invoice_pdf
+from .outbox import record_order_event, record_status_change, record_bulk_status_change
+from .utils import open_cached_invoice, invoice_snapshot, invoice_fingerprint, INVOICE_STREAM_BLOCK_SIZE
 from django.core.mail import EmailMessage
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework.permissions import IsAuthenticated
 
 
@@ -24,7 +43,8 @@ class CheckoutView(APIView):
         user = request.user
         items_data = request.data.get('items', [])
 
-        cart_items = CartItem.objects.filter(user=user).select_related("product")
+        # product order keeps concurrent checkouts locking rows in the same order
+        cart_items = CartItem.objects.filter(user=user).select_related("product").order_by("product_id")
 
         if not cart_items.exists():
             return Response(
@@ -32,35 +52,174 @@ class CheckoutView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        coupon = None
+        coupon_code = (request.data.get("coupon_code") or "").strip()
+        if coupon_code:
+            try:
+                coupon = get_valid_coupon(coupon_code, user)
+            except CouponError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # stock minus what other carts hold; then hold ours while checkout runs
+        levels = available_stock([item.product for item in cart_items], user=user)
         for item in cart_items:
-            if item.product.stock < item.quantity:
+            if levels[item.product_id] < item.quantity:
                 return Response(
                     {"error": f"Not enough stock for: {item.product.name}"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+        product_ids = [item.product_id for item in cart_items]
+        previous_holds = current_holds(user, product_ids)
+        hold_stock(user, {item.product_id: item.quantity for item in cart_items})
+
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(user=user, total_price=0)
+
+                total = 0
+                for item in cart_items:
+                    OrderItem.objects.create(
+                        order=order,
+                        product=item.product,
+                        quantity=item.quantity,
+                        unit_price=item.product.price,
+                    )
+                    total += item.product.price * item.quantity
+
+                    # conditional decrement: fails instead of overselling if someone got there first
+                    decrement_stock(item.product, item.quantity)
+
+                record_movements("sale", [(item.product_id, -item.quantity) for item in cart_items], order_id=order.id)
+                release_holds(user, product_ids)
+                cart_items.delete()
+
+                coupon_amount = 0
+                if coupon is not None:
+                    # last write before commit: the coupon row stays locked until then
+                    coupon_amount = redeem_coupon(coupon, user, order, total)
+
+                order.total_price = total - coupon_amount
+                order.save()
+
+                record_order_event(
+                    order, "created",
+                    total_price=order.total_price,
+                    coupon_code=coupon.code if coupon else None,
+                    coupon_amount=coupon_amount,
+                )
+        except (InsufficientStock, CouponError) as e:
+            # the order rolled back and the items stay in the cart: undo only what this
+            # checkout's hold_stock changed, keeping the add-to-cart holds as they were
+            restore_holds(user, product_ids, previous_holds)
+            if isinstance(e, InsufficientStock):
+                name = next(item.product.name for item in cart_items if item.product_id == e.product_id)
+                return Response({"error": f"Not enough stock for: {name}"}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        order = Order.objects.create(user=user, total_price=0)
+        serializer = OrderSerializer(order)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        total = 0
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                unit_price=item.product.price,
-            )
-            total += item.product.price * item.quantity
 
-            item.product.stock -= item.quantity
-            item.product.save()
+class OrderListView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        order.total_price = total
-        order.save()
+    def get(self, request):
+        # archived (cold) orders are merged in so history looks the same as before archiving
+        orders = order_history(request.user)
+        return Response([serialize_order(order) for order in orders], status=status.HTTP_200_OK)
 
-        cart_items.delete()
 
-        serializer = OrderSerializer(order)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+class OrderDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        order = find_order(pk, user=None if request.user.is_staff else request.user)
+        if order is None:
+            return Response({"error": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_order(order), status=status.HTTP_200_OK)
+
+
+class AdminOrderPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class AdminOrderListView(generics.ListAPIView):
+    """
+    GET /api/orders/all/?status=processing&ordering=-discounted_total
+    Sorting and filtering by the charged amount happen in SQL on the generated column.
+    """
+    serializer_class = OrderSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = AdminOrderPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["created_at", "total_price", "discounted_total", "status"]
+
+    def get_queryset(self):
+        queryset = Order.objects.prefetch_related("items__product")
+
+        order_status = self.request.query_params.get("status")
+        if order_status:
+            queryset = queryset.filter(status=order_status)
+
+        for param, lookup in (("min_total", "discounted_total__gte"), ("max_total", "discounted_total__lte")):
+            value = self.request.query_params.get(param)
+            if value is not None:
+                queryset = queryset.filter(**{lookup: self._parse_amount(param, value)})
+
+        return queryset
+
+    @staticmethod
+    def _parse_amount(param, value):
+        try:
+            amount = Decimal(value)
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite():
+            raise ValidationError({param: "Must be a number."})
+        return amount
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def admin_revenue_report(request):
+    """
+    Revenue (amount actually charged) per day, summed by the database over
+    both the hot and the archived orders. Cancelled/returned orders are excluded.
+    """
+    since = parse_date(request.query_params.get("since") or "")
+    until = parse_date(request.query_params.get("until") or "")
+
+    rows = {}
+    for model in (Order, ArchivedOrder):
+        queryset = model.objects.exclude(status__in=["cancelled", "returned"])
+        if since:
+            queryset = queryset.filter(created_at__date__gte=since)
+        if until:
+            queryset = queryset.filter(created_at__date__lte=until)
+        daily = (
+            queryset.annotate(day=TruncDate("created_at"))
+            .values("day")
+            .annotate(orders=Count("id"), gross=Sum("total_price"), revenue=Sum("discounted_total"))
+            .order_by()
+        )
+        for row in daily:
+            total = rows.setdefault(row["day"], {"day": row["day"], "orders": 0, "gross": Decimal("0"), "revenue": Decimal("0")})
+            total["orders"] += row["orders"]
+            total["gross"] += row["gross"] or 0
+            total["revenue"] += row["revenue"] or 0
+
+    days = [rows[day] for day in sorted(rows)]
+    return Response(
+        {
+            "days": days,
+            "orders": sum(day["orders"] for day in days),
+            "gross": sum((day["gross"] for day in days), Decimal("0")),
+            "revenue": sum((day["revenue"] for day in days), Decimal("0")),
+        },
+        status=status.HTTP_200_OK
+    )
 
 
 class OrderCancelView(APIView):
@@ -75,8 +234,18 @@ class OrderCancelView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        order.status = 'cancalled'
-        order.save()
+        with transaction.atomic():
+            # re-check under the row lock so a double click cannot restock twice
+            order = Order.objects.select_for_update().get(pk=order.pk)
+            if order.status != 'processing':
+                return Response(
+                    {"error": "Cannot cancel order. It is already in transit or delivered."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            order.status = 'cancelled'
+            order.save()
+            restore_stock([order.id], 'cancelled')
+            record_status_change(order, old_status='processing')
 
         return Response({"Order cancelled successfully."}, status=status.HTTP_200_OK)
 
@@ -107,8 +276,10 @@ class OrderReturnView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        order.status = 'return_requested'
-        order.save()
+        with transaction.atomic():
+            order.status = 'return_requested'
+            order.save()
+            record_status_change(order, old_status='delivered')
 
         return Response(
             {"message": "Return request submitted. Waiting for approval."},
@@ -134,8 +305,22 @@ def admin_update_order_status(request, order_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    order.status = new_status
-    order.save()
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(id=order.id)
+        old_status = order.status
+        # same rules as the bulk endpoint; cancelled/returned are final, so stock is restored once
+        if new_status not in Order.ALLOWED_TRANSITIONS.get(old_status, ()):
+            return Response(
+                {"error": f"Cannot move from '{old_status}' to '{new_status}'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        order.status = new_status
+        if old_status == 'in-transit' and new_status == 'delivered':
+            order.delivered_at = timezone.now()
+        order.save()
+        if new_status in RESTOCK_REASONS:
+            restore_stock([order.id], new_status)
+        record_status_change(order, old_status=old_status)
 
     return Response(
         {"message": "Status updated", "order_id": order_id, "new_status": new_status},
@@ -144,6 +329,76 @@ def admin_update_order_status(request, order_id):
 
 
 
+BULK_STATUS_MAX_ORDERS = 1000
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def admin_bulk_update_order_status(request):
+    order_ids = request.data.get("order_ids")
+    new_status = request.data.get("status")
+
+    valid = [choice[0] for choice in Order.STATUS_CHOICES]
+    if new_status not in valid:
+        return Response(
+            {"error": f"Invalid status. Must be one of: {valid}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not isinstance(order_ids, list) or not order_ids:
+        return Response({"error": "order_ids must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(order_ids) > BULK_STATUS_MAX_ORDERS:
+        return Response(
+            {"error": f"At most {BULK_STATUS_MAX_ORDERS} orders per request."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    # int() alone would also take true, 1.9 and " 7 "
+    if not all(
+        (isinstance(order_id, int) and not isinstance(order_id, bool))
+        or (isinstance(order_id, str) and order_id.isascii() and order_id.isdigit())
+        for order_id in order_ids
+    ):
+        return Response({"error": "order_ids must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+    order_ids = list(dict.fromkeys(int(order_id) for order_id in order_ids))
+
+    allowed_from = [old for old, targets in Order.ALLOWED_TRANSITIONS.items() if new_status in targets]
+    now = timezone.now()
+    updates = {"status": new_status, "updated_at": now}
+    if new_status == "delivered":
+        # a rejected return (return_requested -> delivered) keeps its original
+        # delivery date; SET reads the old status, so only in-transit rows are stamped
+        updates["delivered_at"] = Case(When(status="in-transit", then=Value(now)), default=F("delivered_at"))
+
+    with transaction.atomic():
+        # Lock the rows so the statuses we validate are the ones we overwrite
+        rows = Order.objects.select_for_update().filter(id__in=order_ids).values_list("id", "status", "user_id")
+        current = {order_id: (old_status, user_id) for order_id, old_status, user_id in rows}
+        eligible = [order_id for order_id in order_ids if order_id in current and current[order_id][0] in allowed_from]
+        if eligible:
+            Order.objects.filter(id__in=eligible).update(**updates)
+            if new_status in RESTOCK_REASONS:
+                # allowed_from never includes cancelled/returned, so nothing is restocked twice
+                restore_stock(eligible, new_status)
+            record_bulk_status_change({order_id: current[order_id] for order_id in eligible}, new_status)
+
+    results = []
+    for order_id in order_ids:
+        if order_id not in current:
+            results.append({"order_id": order_id, "result": "not_found"})
+        elif current[order_id][0] in allowed_from:
+            results.append({"order_id": order_id, "result": "updated"})
+        else:
+            results.append({
+                "order_id": order_id,
+                "result": "invalid_transition",
+                "error": f"Cannot move from '{current[order_id][0]}' to '{new_status}'.",
+            })
+
+    return Response(
+        {"new_status": new_status, "updated": len(eligible), "results": results},
+        status=status.HTTP_200_OK
+    )
+
 
 class ApplyDiscountView(APIView):
     permission_classes = [IsAuthenticated]
@@ -181,14 +436,61 @@ class ApplyDiscountView(APIView):
         serializer = OrderSerializer(order)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+class DiscountCampaignView(APIView):
+    """
+    GET  -> past campaigns (audit log)
+    POST {"filters": {...}, "discount_percentage": 10, "name": "...", "preview": true}
+         -> with preview only counts the matching orders, otherwise applies the
+            discount to all of them in one UPDATE
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if getattr(request.user, "role", None) != "Sales Manager":
+            return Response(
+                {"detail": "Only Sales Manager can view discount campaigns."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        campaigns = DiscountCampaign.objects.all()[:100]
+        return Response(DiscountCampaignSerializer(campaigns, many=True).data)
+
+    def post(self, request):
+        if getattr(request.user, "role", None) != "Sales Manager":
+            return Response(
+                {"detail": "Only Sales Manager can apply discount."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        filters = request.data.get("filters") or {}
+        if not isinstance(filters, dict):
+            return Response({"detail": "filters must be an object."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if request.data.get("preview"):
+                return Response({"affected_orders": preview_campaign(filters)}, status=status.HTTP_200_OK)
+
+            campaign = apply_campaign(
+                filters,
+                request.data.get("discount_percentage"),
+                user=request.user,
+                name=request.data.get("name", ""),
+            )
+        except CampaignError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(DiscountCampaignSerializer(campaign).data, status=status.HTTP_201_CREATED)
+
+
 class SendInvoiceView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
         order = get_object_or_404(Order, pk=pk, user=request.user)
 
-        # PDF oluştur
-        pdf_buffer = generate_invoice_pdf(order)
+        # PDF oluştur (cache'de varsa tekrar render edilmez)
+        pdf, _ = open_cached_invoice(order)
+        with pdf:
+            content = pdf.read()
 
         # Email oluştur
         email = EmailMessage(
@@ -200,10 +502,43 @@ class SendInvoiceView(APIView):
         # PDF'i maile ekle
         email.attach(
             filename=f"invoice_{order.id}.pdf",
-            content=pdf_buffer.read(),
+            content=content,
             mimetype="application/pdf"
         )
 
         email.send()
 
-        return Response({"message": "Invoice sent successfully!"})
\ No newline at end of file
+        return Response({"message": "Invoice sent successfully!"})
+
+
+class InvoiceDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        if request.user.is_staff:
+            order = get_object_or_404(Order.objects.select_related("user"), pk=pk)
+        else:
+            order = get_object_or_404(Order.objects.select_related("user"), pk=pk, user=request.user)
+
+        snapshot = invoice_snapshot(order)
+        etag = f'"{invoice_fingerprint(snapshot)}"'
+        last_modified = int(order.updated_at.timestamp())
+
+        # Same contents -> same hash, so the client's copy is still valid
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        pdf, _ = open_cached_invoice(snapshot=snapshot)
+
+        response = FileResponse(
+            pdf,
+            as_attachment=True,
+            filename=f"invoice_{order.id}.pdf",
+            content_type="application/pdf",
+        )
+        response.block_size = INVOICE_STREAM_BLOCK_SIZE
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        response["Last-Modified"] = http_date(last_modified)
+        return response
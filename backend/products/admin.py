@@ -1,4 +1,31 @@
 from django.contrib import admin
-from .models import Product
-admin.site.register(Product) # Save model to the panel
-# Register your models here.
+from .models import InventoryMovement, Product
+
+
+@admin.register(Product) # Save model to the panel
+class ProductAdmin(admin.ModelAdmin):
+    # maintained by code: shard_stock for stock_shards, reviews.ratings for the rating totals
+    readonly_fields = ("stock_shards", "rating_count", "rating_sum")
+
+    def get_readonly_fields(self, request, obj=None):
+        # a sharded product's stock column is only a copy of the shard total
+        if obj is not None and obj.stock_shards:
+            return self.readonly_fields + ("stock",)
+        return self.readonly_fields
+
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(admin.ModelAdmin):
+    list_display = ("product", "delta", "reason", "order_id", "created_at")
+    list_filter = ("reason",)
+    search_fields = ("product__name", "=order_id")
+
+    # the ledger is append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,10 @@
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from cart.models import CartItem
+from wishlist.models import Wishlist
 from .models import Product
 from .serializers import ProductSerializer
 
@@ -42,4 +46,15 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         if min_warranty is not None:
             queryset = queryset.filter(warranty__gte=min_warranty)
 
+        # ✅ BADGES: heart / in-cart for the signed-in user, in the same query
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                in_wishlist=Exists(Wishlist.objects.filter(user=user, product=OuterRef("pk"))),
+                cart_qty=Coalesce(
+                    Subquery(CartItem.objects.filter(user=user, product=OuterRef("pk")).values("quantity")[:1]),
+                    0,
+                ),
+            )
+
         return queryset
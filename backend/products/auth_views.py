@@ -2,10 +2,12 @@ from django.contrib.auth.models import User
 from django.db import transaction
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from users.authentication import CustomerRefreshToken
+from users.throttling import REGISTER_THROTTLES
 
 class RegisterView(APIView):
     permission_classes = []
+    throttle_classes = REGISTER_THROTTLES
 
     @transaction.atomic
     def post(self, request):
@@ -19,5 +21,5 @@ class RegisterView(APIView):
             return Response({"message": "email already in use"}, status=400)
 
         user = User.objects.create_user(username=email, email=email, password=password, first_name=name)
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomerRefreshToken.for_user(user)
         return Response({"access": str(refresh.access_token), "refresh": str(refresh)}, status=201)
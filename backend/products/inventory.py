@@ -0,0 +1,123 @@
+"""
+Stock reads and writes that stay correct under concurrent checkouts.
+
+Every decrement is a conditional UPDATE (stock >= qty), never a read then a
+save, so two checkouts cannot both take the last unit.
+
+A product with stock_shards = N keeps its stock in N StockShard rows instead
+of the products_product row. A decrement picks a random shard and falls back
+to the others, so concurrent checkouts of one hot product lock different
+rows instead of queueing on one. Exact reads sum the shards; Product.stock
+is refreshed by the rebalancer and is only a display copy in that mode.
+"""
+import random
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+
+from .models import Product, StockShard
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Not enough stock for product {product_id}")
+        self.product_id = product_id
+
+
+def stock_levels(products):
+    """Exact stock for each product, {product_id: stock}; one extra query if any are sharded."""
+    levels = {product.id: product.stock for product in products}
+    sharded = [product.id for product in products if product.stock_shards]
+    if sharded:
+        totals = StockShard.objects.filter(product_id__in=sharded).values("product_id").annotate(total=Sum("count"))
+        levels.update({row["product_id"]: row["total"] for row in totals})
+    return levels
+
+
+def current_stock(product):
+    return stock_levels([product])[product.id]
+
+
+def decrement_stock(product, quantity):
+    """Takes quantity units; raises InsufficientStock and changes nothing if they are not there."""
+    if not product.stock_shards:
+        taken = Product.objects.filter(pk=product.pk, stock__gte=quantity).update(stock=F("stock") - quantity)
+        if not taken:
+            raise InsufficientStock(product.pk)
+        return
+
+    shards = StockShard.objects.filter(product_id=product.pk)
+    start = random.randrange(product.stock_shards)
+    for offset in range(product.stock_shards):
+        index = (start + offset) % product.stock_shards
+        if shards.filter(index=index, count__gte=quantity).update(count=F("count") - quantity):
+            return
+
+    # no single shard holds enough: lock them all and take from several
+    with transaction.atomic():
+        rows = list(shards.select_for_update().order_by("index"))
+        if sum(row.count for row in rows) < quantity:
+            raise InsufficientStock(product.pk)
+        remaining = quantity
+        for row in rows:
+            take = min(row.count, remaining)
+            if take:
+                shards.filter(pk=row.pk).update(count=F("count") - take)
+                remaining -= take
+            if not remaining:
+                break
+
+
+def increment_stock(product, quantity):
+    if not product.stock_shards:
+        Product.objects.filter(pk=product.pk).update(stock=F("stock") + quantity)
+        return
+    # spread the units like set_shard_count does, from a random shard so
+    # small restocks do not always land on the low indexes; one UPDATE
+    start = random.randrange(product.stock_shards)
+    shares = {
+        (start + offset) % product.stock_shards: count
+        for offset, count in enumerate(_split(quantity, product.stock_shards))
+        if count
+    }
+    StockShard.objects.filter(product_id=product.pk, index__in=shares).update(
+        count=F("count") + Case(*[When(index=index, then=Value(count)) for index, count in shares.items()], default=Value(0))
+    )
+
+
+def set_shard_count(product_id, shards):
+    """Turns sharding on (shards > 0), changes the shard count, or turns it off (0)."""
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        if product.stock_shards:
+            # lock the shards too, or a decrement could land between the sum and the delete
+            total = sum(StockShard.objects.select_for_update().filter(product_id=product.pk).values_list("count", flat=True))
+        else:
+            total = product.stock
+        StockShard.objects.filter(product_id=product.pk).delete()
+        if shards:
+            StockShard.objects.bulk_create([
+                StockShard(product_id=product.pk, index=index, count=count)
+                for index, count in enumerate(_split(total, shards))
+            ])
+        Product.objects.filter(pk=product.pk).update(stock=total, stock_shards=shards)
+    return total
+
+
+def rebalance(product_id):
+    """Spreads a sharded product's stock evenly again and refreshes Product.stock."""
+    with transaction.atomic():
+        rows = list(StockShard.objects.select_for_update().filter(product_id=product_id).order_by("index"))
+        if not rows:
+            return None
+        total = sum(row.count for row in rows)
+        for row, count in zip(rows, _split(total, len(rows))):
+            row.count = count
+        StockShard.objects.bulk_update(rows, ["count"])
+        Product.objects.filter(pk=product_id).update(stock=total)
+    return total
+
+
+def _split(total, parts):
+    base, extra = divmod(total, parts)
+    return [base + (1 if index < extra else 0) for index in range(parts)]
@@ -0,0 +1,150 @@
+"""
+Inventory ledger: every stock change is an InventoryMovement row, and
+InventorySnapshot rows checkpoint each product's running total.
+
+Stock at time T = the product's last snapshot taken at or before T, plus
+the movements after that snapshot's last_movement_id up to T. Reads then
+scan only the movements since one snapshot, on the (product, id) index,
+instead of the whole history.
+"""
+from datetime import timedelta
+
+from django.db.models import Case, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .inventory import stock_levels
+from .models import InventoryMovement, InventorySnapshot, Product, StockShard
+
+# Movement ids are handed out before commit; snapshots leave the newest few
+# seconds alone so a slow transaction cannot commit behind a snapshot.
+SNAPSHOT_SETTLE_SECONDS = 5
+
+
+def record_movements(reason, lines, order_id=None):
+    """lines: iterable of (product_id, delta). One bulk INSERT."""
+    return record_order_movements(reason, [(order_id, product_id, delta) for product_id, delta in lines])
+
+
+def record_order_movements(reason, lines):
+    """lines: iterable of (order_id, product_id, delta), for several orders at once."""
+    return InventoryMovement.objects.bulk_create([
+        InventoryMovement(product_id=product_id, delta=delta, reason=reason, order_id=order_id)
+        for order_id, product_id, delta in lines
+        if delta
+    ])
+
+
+def _latest_snapshot(field, before=None):
+    snapshots = InventorySnapshot.objects.filter(product=OuterRef("pk"))
+    if before is not None:
+        snapshots = snapshots.filter(taken_at__lte=before)
+    return Subquery(snapshots.order_by("-taken_at", "-id").values(field)[:1])
+
+
+def _movement_sum(after_ref, up_to_id=None, up_to_time=None):
+    movements = InventoryMovement.objects.filter(product=OuterRef("pk"), id__gt=OuterRef(after_ref))
+    if up_to_id is not None:
+        movements = movements.filter(id__lte=up_to_id)
+    if up_to_time is not None:
+        movements = movements.filter(created_at__lte=up_to_time)
+    total = movements.order_by().values("product").annotate(total=Sum("delta")).values("total")
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def _movements_after(movement_id):
+    total = (
+        InventoryMovement.objects.filter(product=OuterRef("pk"), id__gt=movement_id)
+        .order_by().values("product").annotate(total=Sum("delta")).values("total")
+    )
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def _shard_total():
+    total = StockShard.objects.filter(product=OuterRef("pk")).order_by().values("product").annotate(total=Sum("count")).values("total")
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def with_ledger_stock(queryset, at=None):
+    """
+    Annotates products with snapshot_stock (None without a snapshot) and ledger_stock,
+    as of `at` (default: now). One query.
+    """
+    return queryset.annotate(
+        snapshot_stock=_latest_snapshot("stock", before=at),
+        snapshot_last_id=_latest_snapshot("last_movement_id", before=at),
+    ).annotate(
+        ledger_stock=F("snapshot_stock") + _movement_sum("snapshot_last_id", up_to_time=at),
+    )
+
+
+def stock_at(product_id, when):
+    """Stock of one product at a past moment, or None before its first snapshot."""
+    product = with_ledger_stock(Product.objects.filter(pk=product_id), at=when).values(
+        "snapshot_stock", "ledger_stock"
+    ).first()
+    if product is None or product["snapshot_stock"] is None:
+        return None
+    return product["ledger_stock"]
+
+
+def take_snapshots(now=None):
+    """
+    Writes a snapshot for every product whose ledger moved since its last one.
+    Products without any snapshot get an opening one from their current stock.
+    Returns (snapshots written, openings among them).
+    """
+    now = now or timezone.now()
+    boundary = InventoryMovement.objects.filter(
+        created_at__lte=now - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+    ).aggregate(last=Max("id"))["last"] or 0
+
+    products = list(
+        Product.objects.annotate(
+            snapshot_stock=_latest_snapshot("stock"),
+            snapshot_last_id=_latest_snapshot("last_movement_id"),
+            # for opening balances: the live stock and the movements past the boundary,
+            # read in this one statement so both come from the same database snapshot
+            live_stock=Case(When(stock_shards=0, then=F("stock")), default=_shard_total()),
+            unsettled=_movements_after(boundary),
+        ).annotate(
+            moved=_movement_sum("snapshot_last_id", up_to_id=boundary),
+        ).only("id", "stock", "stock_shards")
+    )
+
+    openings = [product for product in products if product.snapshot_stock is None]
+    snapshots = [
+        # opening balance as of the boundary, like every other snapshot: movements past
+        # it are either in live_stock and subtracted here, or not committed yet and
+        # picked up from the ledger later
+        InventorySnapshot(
+            product_id=product.id,
+            stock=product.live_stock - product.unsettled,
+            last_movement_id=boundary,
+            taken_at=now,
+        )
+        for product in openings
+    ]
+    snapshots += [
+        InventorySnapshot(
+            product_id=product.id,
+            stock=product.snapshot_stock + product.moved,
+            last_movement_id=boundary,
+            taken_at=now,
+        )
+        for product in products
+        if product.snapshot_stock is not None and product.moved
+    ]
+    InventorySnapshot.objects.bulk_create(snapshots)
+    return len(snapshots), len(openings)
+
+
+def drift_report():
+    """[(product, ledger_stock, actual_stock)] for products whose stock disagrees with the ledger."""
+    products = list(with_ledger_stock(Product.objects.all()).filter(snapshot_stock__isnull=False).order_by("id"))
+    actual = stock_levels(products)
+    return [
+        (product, product.ledger_stock, actual[product.id])
+        for product in products
+        if product.ledger_stock != actual[product.id]
+    ]
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from products.inventory import InsufficientStock, current_stock, decrement_stock, set_shard_count
+from products.models import Product
+
+BENCH_PRODUCT_NAME = "bench-stock (temporary)"
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one product with concurrent single-unit decrements, unsharded and then "
+        "sharded, and report throughput. Meant for PostgreSQL; SQLite serialises all writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--per-thread", type=int, default=200, help="Decrements per thread.")
+        parser.add_argument("--shards", type=int, default=16)
+
+    def handle(self, *args, **options):
+        units = options["threads"] * options["per_thread"]
+        product = Product.objects.create(name=BENCH_PRODUCT_NAME, price=1, stock=units)
+        try:
+            for shards in (0, options["shards"]):
+                Product.objects.filter(pk=product.pk).update(stock=units)
+                set_shard_count(product.pk, shards)
+                elapsed, sold, failed = self.run(product.pk, options["threads"], options["per_thread"])
+                left = current_stock(Product.objects.get(pk=product.pk))
+                self.stdout.write(
+                    f"shards={shards:>3}: {sold} sold in {elapsed:.2f}s ({sold / elapsed:.0f}/s), "
+                    f"{failed} refused, {left} left (expected {units - sold})"
+                )
+        finally:
+            Product.objects.filter(pk=product.pk).delete()
+
+    def run(self, product_id, threads, per_thread):
+        counts = {"sold": 0, "failed": 0}
+        lock = threading.Lock()
+        start = threading.Barrier(threads)
+
+        def worker():
+            product = Product.objects.get(pk=product_id)
+            sold = failed = 0
+            start.wait()
+            try:
+                for _ in range(per_thread):
+                    try:
+                        decrement_stock(product, 1)
+                        sold += 1
+                    except InsufficientStock:
+                        failed += 1
+            finally:
+                connection.close()
+            with lock:
+                counts["sold"] += sold
+                counts["failed"] += failed
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, counts["sold"], counts["failed"]
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.inventory import rebalance
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Spread each sharded product's stock evenly over its shards again and refresh "
+        "Product.stock. Run every few seconds during a sale with --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, help="Keep running, rebalancing every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            product_ids = list(Product.objects.filter(stock_shards__gt=0).values_list("id", flat=True))
+            for product_id in product_ids:
+                rebalance(product_id)
+            self.stdout.write(f"rebalanced {len(product_ids)} sharded products")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
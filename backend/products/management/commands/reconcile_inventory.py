@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.ledger import drift_report
+
+
+class Command(BaseCommand):
+    help = "Compare each product's stock with what the inventory ledger says it should be."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fail-on-drift", action="store_true", help="Exit non-zero if any product drifted.")
+
+    def handle(self, *args, **options):
+        drifted = drift_report()
+        for product, ledger_stock, actual in drifted:
+            self.stdout.write(
+                f"#{product.id} {product.name}: ledger {ledger_stock}, stock {actual} ({actual - ledger_stock:+d})"
+            )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("No drift: stock matches the ledger for every snapshotted product."))
+        elif options["fail_on_drift"]:
+            raise CommandError(f"{len(drifted)} products drifted from the ledger.")
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} products drifted from the ledger."))
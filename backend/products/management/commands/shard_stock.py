@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.inventory import set_shard_count
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Split a product's stock over N counter rows for flash sales (0 folds it back into the product row)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("product_id", type=int)
+        parser.add_argument("shards", type=int, help="Number of shards; 0 turns sharding off.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["shards"] <= 256:
+            raise CommandError("shards must be between 0 and 256.")
+        try:
+            total = set_shard_count(options["product_id"], options["shards"])
+        except Product.DoesNotExist:
+            raise CommandError(f"Product {options['product_id']} does not exist.")
+        mode = f"{options['shards']} shards" if options["shards"] else "unsharded"
+        self.stdout.write(self.style.SUCCESS(f"Product {options['product_id']}: {total} units, {mode}."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.ledger import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Checkpoint every product's stock in the inventory ledger (run daily from cron). "
+        "The first run records each product's current stock as its opening balance."
+    )
+
+    def handle(self, *args, **options):
+        written, openings = take_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"{written} snapshots written ({openings} opening balances)."))
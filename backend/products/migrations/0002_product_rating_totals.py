@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_totals(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Rating = apps.get_model('reviews', 'Rating')
+    ratings = Rating.objects.filter(product_id=OuterRef('pk')).order_by().values('product_id')
+    Product.objects.update(
+        rating_count=Coalesce(Subquery(ratings.annotate(n=Count('id')).values('n')), 0),
+        rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('score')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_totals, migrations.RunPython.noop),
+    ]
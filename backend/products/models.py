@@ -10,5 +10,77 @@ class Product(models.Model):
 
     description = models.TextField(blank=True, null=True)
 
+    # >0 splits stock over that many StockShard rows (products.inventory); stock is
+    # then a copy refreshed by the rebalancer, and exact reads sum the shards
+    stock_shards = models.PositiveSmallIntegerField(default=0)
+
+    # kept in step with reviews.Rating by reviews.ratings.refresh_product_rating
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # what was loaded, so post_save receivers can tell what changed
+        # (restocks and price drops in wishlist.signals, manual adjustments in products.signals)
+        instance._loaded_stock_price = (instance.__dict__.get("stock"), instance.__dict__.get("price"))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # after every post_save receiver has compared against the old values
+        self._loaded_stock_price = (self.__dict__.get("stock"), self.__dict__.get("price"))
+
+
+class StockShard(models.Model):
+    """One slice of a sharded product's stock; checkouts decrement a random slice."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_shard_rows")
+    index = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("product", "index")
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.product_id}#{self.index}: {self.count}"
+
+
+class InventoryMovement(models.Model):
+    """Append-only stock ledger (products.ledger). delta is signed: sales are negative."""
+    REASON_CHOICES = (
+        ("sale", "Sale"),
+        ("cancellation", "Cancellation"),
+        ("return", "Return"),
+        ("adjustment", "Manual adjustment"),
+    )
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    # plain id, not a FK: orders can be archived out of orders_order
+    order_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "id"]),  # movements after a snapshot
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.delta:+d} ({self.reason})"
+
+
+class InventorySnapshot(models.Model):
+    """Stock of a product as of ledger movement last_movement_id."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    stock = models.IntegerField()
+    last_movement_id = models.BigIntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "-taken_at"]),
+        ]
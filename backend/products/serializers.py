@@ -9,9 +9,15 @@ class ProductSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "price", "stock", "warranty", "description", "rating"]
 
     def get_rating(self, obj):
-        """Calculate average rating from reviews"""
-        ratings = obj.reviews.all()
-        if not ratings.exists():
+        """Average rating, from the totals stored on the product"""
+        if not obj.rating_count:
             return None
-        avg = sum(r.score for r in ratings) / ratings.count()
-        return round(avg, 1)
+        return round(obj.rating_sum / obj.rating_count, 1)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # annotated by ProductViewSet for signed-in users
+        if hasattr(instance, "in_wishlist"):
+            data["in_wishlist"] = instance.in_wishlist
+            data["cart_qty"] = instance.cart_qty
+        return data
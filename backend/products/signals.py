@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .ledger import record_movements
+from .models import Product
+
+
+@receiver(post_save, sender=Product)
+def record_stock_adjustment(sender, instance, created, **kwargs):
+    # saves that change stock are manual (admin, shell); checkouts and restores
+    # use conditional UPDATEs and write their own movements
+    new_stock = instance.__dict__.get("stock")
+    if created:
+        old_stock = 0
+    else:
+        loaded = getattr(instance, "_loaded_stock_price", None)
+        if loaded is None or loaded[0] is None or new_stock is None:
+            return
+        old_stock = loaded[0]
+    if new_stock != old_stock:
+        record_movements("adjustment", [(instance.pk, new_stock - old_stock)])
@@ -1,3 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+from django.utils import timezone
+
+from . import ledger
+from .inventory import InsufficientStock, current_stock, decrement_stock, increment_stock, set_shard_count
+from .models import InventoryMovement, InventorySnapshot, Product, StockShard
+
+
+def settled():
+    # take_snapshots leaves the newest SNAPSHOT_SETTLE_SECONDS alone
+    return timezone.now() + timedelta(seconds=ledger.SNAPSHOT_SETTLE_SECONDS + 1)
+
+
+class InventoryLedgerTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Ledger Product', price=10, stock=10)
+
+    def sell(self, quantity):
+        decrement_stock(self.product, quantity)
+        ledger.record_movements('sale', [(self.product.id, -quantity)])
+
+    def test_ledger_matches_stock_after_changes(self):
+        product = Product.objects.get(pk=self.product.pk)
+        product.stock = 12
+        product.save()
+        self.sell(3)
+
+        ledger.take_snapshots(now=settled())
+
+        self.assertEqual(ledger.drift_report(), [])
+        snapshot = InventorySnapshot.objects.get(product=self.product)
+        self.assertEqual(snapshot.stock, 9)
+
+    def test_unrecorded_change_is_reported_as_drift(self):
+        ledger.take_snapshots(now=settled())
+        Product.objects.filter(pk=self.product.pk).update(stock=4)
+
+        drifted = ledger.drift_report()
+
+        self.assertEqual([(product.id, ledger_stock, actual) for product, ledger_stock, actual in drifted],
+                         [(self.product.id, 10, 4)])
+        with self.assertRaises(CommandError):
+            call_command('reconcile_inventory', '--fail-on-drift', stdout=StringIO())
+
+    def test_opening_snapshot_counts_unsettled_sale_once(self):
+        InventoryMovement.objects.filter(product=self.product).update(created_at=timezone.now() - timedelta(minutes=1))
+        self.sell(2)  # younger than the settle window
+
+        ledger.take_snapshots()
+
+        # opening balance as of before the sale; the sale is counted from the ledger
+        self.assertEqual(InventorySnapshot.objects.get(product=self.product).stock, 10)
+        self.assertEqual(ledger.drift_report(), [])
+
+    def test_sharded_product_reconciles(self):
+        set_shard_count(self.product.pk, 4)
+        self.product.refresh_from_db()
+        self.sell(3)
+
+        ledger.take_snapshots(now=settled())
+
+        self.assertEqual(ledger.drift_report(), [])
+
+
+class ShardedStockTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Hot Product', price=10, stock=10)
+        set_shard_count(self.product.pk, 4)
+        self.product.refresh_from_db()
+
+    def test_decrement_never_oversells(self):
+        sold = 0
+        while True:
+            try:
+                decrement_stock(self.product, 3)
+            except InsufficientStock:
+                break
+            sold += 3
+
+        self.assertEqual(sold, 9)
+        self.assertEqual(current_stock(self.product), 1)
+
+    def test_decrement_spans_shards_when_none_holds_enough(self):
+        decrement_stock(self.product, 7)
+
+        self.assertEqual(current_stock(self.product), 3)
+
+    def test_increment_spreads_across_shards(self):
+        increment_stock(self.product, 8)
 
-# Create your tests here.
+        counts = list(StockShard.objects.filter(product=self.product).values_list('count', flat=True))
+        self.assertEqual(sum(counts), 18)
+        self.assertLessEqual(max(counts) - min(counts), 1)
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Comment, Rating
+from .models import BannedTerm, Comment, Rating
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('customer', 'product', 'status', 'created_at')
-    list_filter = ('status', 'created_at')
+    list_display = ('customer', 'product', 'status', 'is_flagged', 'created_at')
+    list_filter = ('status', 'is_flagged', 'created_at')
     search_fields = ('body', 'customer__username', 'product__name')
 
     
@@ -13,4 +13,10 @@ class CommentAdmin(admin.ModelAdmin):
 @admin.register(Rating)
 class RatingAdmin(admin.ModelAdmin):
     list_display = ('customer', 'product', 'score', 'created_at')
-    list_filter = ('score',)
\ No newline at end of file
+    list_filter = ('score',)
+
+@admin.register(BannedTerm)
+class BannedTermAdmin(admin.ModelAdmin):
+    list_display = ('term', 'whole_word', 'updated_at')
+    list_filter = ('whole_word',)
+    search_fields = ('term',)
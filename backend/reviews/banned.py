@@ -0,0 +1,111 @@
+"""
+Banned-term matching with an Aho-Corasick automaton.
+
+All terms are compiled into one trie with failure links, so a body is
+scanned once, character by character, whatever the number of terms. The
+compiled matcher lives in process memory and is rebuilt only when the
+BannedTerm table changes: the table's (count, last update) stamp is
+re-read at most every VERSION_CHECK_SECONDS, and local saves/deletes
+drop the matcher right away (see reviews.signals).
+"""
+import threading
+import time
+
+from django.db.models import Count, Max
+
+from .models import BannedTerm
+
+VERSION_CHECK_SECONDS = 30
+
+
+class Matcher:
+    def __init__(self, terms):
+        """terms: iterable of (term, whole_word); terms are already normalised."""
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for term, whole_word in terms:
+            self._add(term, whole_word)
+        self._link()
+
+    def _add(self, term, whole_word):
+        if not term:
+            return
+        node = 0
+        for char in term:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = child
+        self.out[node] = self.out[node] + ((term, whole_word),)
+
+    def _link(self):
+        # breadth-first, so every failure target is finished before it is used;
+        # children of the root keep fail = 0
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                target = self.fail[node]
+                while target and char not in self.goto[target]:
+                    target = self.fail[target]
+                self.fail[child] = self.goto[target].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text):
+        """Returns the first banned term in text, or None."""
+        text = " ".join(text.casefold().split())
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term, whole_word in out[node]:
+                if not whole_word or _is_word(text, index - len(term) + 1, index + 1):
+                    return term
+        return None
+
+
+def _is_word(text, start, end):
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+_lock = threading.Lock()
+_matcher = None
+_version = None
+_checked_at = 0.0
+
+
+def _table_version():
+    stamp = BannedTerm.objects.aggregate(count=Count("id"), last=Max("updated_at"))
+    return stamp["count"], stamp["last"]
+
+
+def get_matcher():
+    global _matcher, _version, _checked_at
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return _matcher
+    with _lock:
+        if _matcher is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+            return _matcher
+        version = _table_version()
+        if _matcher is None or version != _version:
+            _matcher = Matcher(BannedTerm.objects.values_list("term", "whole_word").iterator())
+            _version = version
+        _checked_at = now
+    return _matcher
+
+
+def reset_matcher():
+    global _matcher
+    _matcher = None
+
+
+def find_banned_term(body):
+    return get_matcher().find(body)
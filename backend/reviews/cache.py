@@ -0,0 +1,24 @@
+from django.core.cache import cache
+
+# First page of approved comments per product. Dropped whenever a comment of
+# that product changes (see reviews.signals and BulkModerateCommentsView).
+# The drop only reaches other workers through a shared cache (REDIS_URL in
+# settings); on the per-process LocMem default, FIRST_PAGE_TTL is the real
+# bound on how long they serve a stale page.
+FIRST_PAGE_TTL = 10 * 60
+
+
+def first_page_key(product_id):
+    return f"reviews:product:{product_id}:comments:first_page"
+
+
+def get_first_page(product_id):
+    return cache.get(first_page_key(product_id))
+
+
+def set_first_page(product_id, data):
+    cache.set(first_page_key(product_id), data, FIRST_PAGE_TTL)
+
+
+def invalidate_first_pages(product_ids):
+    cache.delete_many([first_page_key(product_id) for product_id in set(product_ids)])
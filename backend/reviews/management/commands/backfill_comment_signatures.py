@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Comment
+from reviews.spam import index_comment, screen_body
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute MinHash signatures and LSH buckets for comments that do not have one yet, "
+        "oldest first, so each comment is compared against the ones written before it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--flag", action="store_true",
+                            help="Also flag pending comments found to be near-duplicates.")
+
+    def handle(self, *args, **options):
+        missing = Comment.objects.filter(signature__isnull=True).order_by("id")
+        indexed = flagged = 0
+        last_id = 0
+        started = time.monotonic()
+        while True:
+            batch = list(missing.filter(id__gt=last_id).only("id", "body", "status")[:options["batch_size"]])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            with transaction.atomic():
+                for comment in batch:
+                    screening = screen_body(comment.body, before_id=comment.id)
+                    index_comment(comment, screening)
+                    indexed += 1
+                    if options["flag"] and comment.status == "pending" and screening.duplicate_of is not None:
+                        Comment.objects.filter(pk=comment.pk).update(
+                            is_flagged=True, flag_reason=screening.flag_reason
+                        )
+                        flagged += 1
+            self.stdout.write(f"indexed {indexed} comments ({time.monotonic() - started:.0f}s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {indexed} comments indexed, {flagged} flagged."))
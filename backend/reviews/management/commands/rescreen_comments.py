@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.banned import find_banned_term
+from reviews.cache import invalidate_first_pages
+from reviews.models import Comment
+
+
+class Command(BaseCommand):
+    help = "Re-check existing comments against the banned-term list and reject the ones that match."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--status", action="append", choices=["pending", "approved"],
+                            help="Statuses to re-screen (repeatable). Default: pending and approved.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report matches.")
+
+    def handle(self, *args, **options):
+        statuses = options["status"] or ["pending", "approved"]
+        comments = Comment.objects.filter(status__in=statuses).order_by("id")
+        scanned = rejected = 0
+        last_id = 0
+        started = time.monotonic()
+        while True:
+            batch = list(comments.filter(id__gt=last_id).only("id", "body", "status", "product_id")[:options["batch_size"]])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            hits = []
+            for comment in batch:
+                term = find_banned_term(comment.body)
+                if term is not None:
+                    comment.flag_reason = f'Banned term: "{term}"'
+                    hits.append(comment)
+            if hits and not options["dry_run"]:
+                approved_products = [c.product_id for c in hits if c.status == "approved"]
+                for comment in hits:
+                    comment.status = "rejected"
+                    comment.is_flagged = True
+                Comment.objects.bulk_update(hits, ["status", "is_flagged", "flag_reason"])
+                # bulk_update skips the post_save signal that normally drops cached pages
+                invalidate_first_pages(approved_products)
+            rejected += len(hits)
+            self.stdout.write(f"scanned {scanned}, matched {rejected} ({time.monotonic() - started:.0f}s)")
+
+        verb = "would be rejected" if options["dry_run"] else "rejected"
+        self.stdout.write(self.style.SUCCESS(f"Done: {rejected} of {scanned} comments {verb}."))
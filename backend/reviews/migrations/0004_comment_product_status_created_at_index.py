@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('reviews', '0003_comment_status_created_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['product', 'status', 'created_at'], name='reviews_com_product_b8d1f0_idx'),
+        ),
+    ]
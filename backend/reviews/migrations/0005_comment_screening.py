@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_comment_product_status_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentSignature',
+            fields=[
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='reviews.comment')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='flag_reason',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='is_flagged',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='CommentLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.comment')),
+            ],
+        ),
+    ]
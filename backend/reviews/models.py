@@ -16,6 +16,16 @@ class Comment(models.Model) :
     status = models.CharField(max_length=10,choices=STATUS_CHOICES, default='pending') #approval logic
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # set by the automatic screening in reviews.spam, for moderators to look at first
+    is_flagged = models.BooleanField(default=False)
+    flag_reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),  # moderation queue
+            models.Index(fields=['product', 'status', 'created_at']),  # approved comments per product
+        ]
+
     def __str__(self):
         return f"Commeny by {self.customer} on {self.product} ({self.status})"
     
@@ -32,4 +42,31 @@ class Rating(models.Model) :
     def __str__(self):
         return f"{self.score}/5 by {self.customer} on {self.product}"
 
+
+class CommentSignature(models.Model):
+    """MinHash signature of a comment body (see reviews.spam)."""
+    comment = models.OneToOneField(Comment, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+
+
+class CommentLSHBucket(models.Model):
+    """One row per LSH band of a comment; near-duplicates share at least one key."""
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='+')
+    key = models.BigIntegerField(db_index=True)
+
+
+class BannedTerm(models.Model):
+    """Words or phrases that get a comment rejected automatically (see reviews.banned)."""
+    term = models.CharField(max_length=100, unique=True)
+    whole_word = models.BooleanField(default=True, help_text="Only match the term as a separate word or phrase.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.term = " ".join(self.term.casefold().split())
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.term
+
 # Create your models here.
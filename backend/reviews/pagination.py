@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ModerationQueuePagination(CursorPagination):
+    # keyset on the (status, created_at) index, oldest pending first
+    ordering = "created_at"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class ProductCommentPagination(CursorPagination):
+    # newest approved comments first, on the (product, status, created_at) index
+    ordering = "-created_at"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
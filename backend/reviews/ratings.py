@@ -0,0 +1,58 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from products.models import Product
+
+from .models import Rating
+
+# created_at is only written on insert, so comparing it with the value we
+# passed in tells an inserted row from an updated one on any backend
+UPSERT_SQL = """
+    INSERT INTO {table} (product_id, customer_id, score, created_at)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (product_id, customer_id) DO UPDATE SET score = EXCLUDED.score
+    RETURNING id, created_at = %s
+"""
+
+
+def submit_rating(product_id, user, score):
+    """
+    Creates or replaces the user's rating with one upsert and applies the
+    change to the product's rating totals in the same transaction. Returns
+    (rating_id, created), or None if the product does not exist.
+
+    The product row is locked first, in the same query that reads the user's
+    old score, so concurrent ratings of one product are applied one after
+    another and the F() deltas never miss a write.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        old_score = Subquery(Rating.objects.filter(product=OuterRef("pk"), customer=user).values("score")[:1])
+        row = (
+            Product.objects.select_for_update().filter(pk=product_id)
+            .annotate(old_score=old_score).values_list("id", "old_score").first()
+        )
+        if row is None:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                UPSERT_SQL.format(table=Rating._meta.db_table),
+                [product_id, user.pk, score, now, now],
+            )
+            rating_id, created = cursor.fetchone()
+        if row[1] is None:
+            Product.objects.filter(pk=product_id).update(rating_count=F("rating_count") + 1, rating_sum=F("rating_sum") + score)
+        elif row[1] != score:
+            Product.objects.filter(pk=product_id).update(rating_sum=F("rating_sum") + (score - row[1]))
+    return rating_id, bool(created)
+
+
+def refresh_product_rating(product_id):
+    """Recounts the totals from scratch; for writes that bypass submit_rating (admin, cascades)."""
+    ratings = Rating.objects.filter(product_id=OuterRef("pk")).order_by().values("product_id")
+    Product.objects.filter(pk=product_id).update(
+        rating_count=Coalesce(Subquery(ratings.annotate(n=Count("id")).values("n")), 0),
+        rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum("score")).values("total")), 0),
+    )
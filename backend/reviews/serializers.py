@@ -17,4 +17,16 @@ class RatingSerializer(serializers.ModelSerializer):
     def validate_score(self, value):
         if value < 1 or value > 5:
             raise serializers.ValidationError("Score must be between 1 and 5.")
-        return value
\ No newline at end of file
+        return value
+
+
+class ModerationCommentSerializer(serializers.ModelSerializer):
+    author = serializers.ReadOnlyField(source='customer.username')
+    author_email = serializers.ReadOnlyField(source='customer.email')
+    product_name = serializers.ReadOnlyField(source='product.name')
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'product', 'product_name', 'author', 'author_email', 'body', 'status',
+                  'is_flagged', 'flag_reason', 'created_at']
+        read_only_fields = fields
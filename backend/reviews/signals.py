@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .banned import reset_matcher
+from .cache import invalidate_first_pages
+from .models import BannedTerm, Comment, Rating
+from .ratings import refresh_product_rating
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    # a brand-new comment is pending and not on the public list yet
+    if created and instance.status != 'approved':
+        return
+    invalidate_first_pages([instance.product_id])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    invalidate_first_pages([instance.product_id])
+
+
+@receiver(post_save, sender=BannedTerm)
+@receiver(post_delete, sender=BannedTerm)
+def banned_terms_changed(sender, **kwargs):
+    # other processes pick the change up on their next version check
+    reset_matcher()
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def rating_changed(sender, instance, **kwargs):
+    # saves and deletes outside submit_rating (admin, cascades) keep the totals right too
+    refresh_product_rating(instance.product_id)
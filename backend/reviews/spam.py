@@ -0,0 +1,129 @@
+"""
+Near-duplicate comment detection with MinHash + locality-sensitive hashing.
+
+Each body is reduced to a set of word 3-grams and summarised by NUM_PERM
+minimum hash values. The signature is cut into BANDS bands; each band is
+hashed into one CommentLSHBucket key. Two comments whose 3-gram sets have
+Jaccard similarity s share at least one key with probability
+1 - (1 - s**ROWS)**BANDS, so a single indexed `key IN (...)` lookup finds
+near-duplicates without looking at the rest of the corpus.
+"""
+import hashlib
+import random
+import re
+import struct
+import zlib
+from array import array
+
+from .models import CommentLSHBucket, CommentSignature
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MIN_WORDS = 6  # shorter bodies ("Great product!") are too generic to compare
+SIMILARITY_THRESHOLD = 0.8
+MAX_CANDIDATES = 50
+
+_MERSENNE = (1 << 61) - 1
+_MASK32 = (1 << 32) - 1
+# fixed seed: signatures must be comparable across processes and deploys
+_rng = random.Random(308)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(body):
+    words = _WORD_RE.findall(body.casefold())
+    if len(words) < MIN_WORDS:
+        return set()
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(hashes):
+    return [min(((a * h + b) % _MERSENNE) & _MASK32 for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<I{ROWS}I", band, *rows), digest_size=8).digest()
+        keys.append(struct.unpack("<q", digest)[0])  # signed, fits BigIntegerField
+    return keys
+
+
+def pack(signature):
+    return array("I", signature).tobytes()
+
+
+def unpack(data):
+    signature = array("I")
+    signature.frombytes(bytes(data))
+    return signature
+
+
+def similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+class Screening:
+    def __init__(self, signature=None, keys=(), duplicate_of=None, score=0.0):
+        self.signature = signature
+        self.keys = list(keys)
+        self.duplicate_of = duplicate_of
+        self.score = score
+
+    @property
+    def flag_reason(self):
+        if self.duplicate_of is None:
+            return ""
+        return f"Near-duplicate of comment #{self.duplicate_of} ({self.score:.0%} similar)"
+
+
+def screen_body(body, exclude_id=None, before_id=None):
+    """
+    Signs the body and looks for an already indexed near-duplicate. With
+    before_id, only comments with a lower id count, so a backfilled comment is
+    never flagged as a copy of something written after it.
+    """
+    hashes = shingles(body)
+    if not hashes:
+        return Screening()
+
+    signature = minhash(hashes)
+    keys = band_keys(signature)
+    screening = Screening(signature, keys)
+
+    candidates = CommentLSHBucket.objects.filter(key__in=keys)
+    if exclude_id is not None:
+        candidates = candidates.exclude(comment_id=exclude_id)
+    if before_id is not None:
+        candidates = candidates.filter(comment_id__lt=before_id)
+    # oldest first: the original of a copied text is the one worth pointing at
+    candidate_ids = list(
+        candidates.order_by("comment_id").values_list("comment_id", flat=True).distinct()[:MAX_CANDIDATES]
+    )
+    if not candidate_ids:
+        return screening
+
+    rows = CommentSignature.objects.filter(comment_id__in=candidate_ids).values_list("comment_id", "minhash")
+    for comment_id, data in rows:
+        score = similarity(signature, unpack(data))
+        if score >= SIMILARITY_THRESHOLD and score > screening.score:
+            screening.duplicate_of, screening.score = comment_id, score
+    return screening
+
+
+def index_comment(comment, screening):
+    """Stores the signature and LSH keys so later comments can be matched against it."""
+    if screening.signature is None:
+        return
+    CommentSignature.objects.create(comment=comment, minhash=pack(screening.signature))
+    CommentLSHBucket.objects.bulk_create(
+        [CommentLSHBucket(comment=comment, key=key) for key in screening.keys]
+    )
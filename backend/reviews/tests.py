@@ -1,3 +1,209 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from products.models import Product
+from . import spam
+from .banned import Matcher
+from .models import BannedTerm, Comment, Rating
+
+Customer = get_user_model()
+
+
+class RatingTotalsTest(APITestCase):
+    def setUp(self):
+        self.users = [
+            Customer.objects.create_user(
+                email=f'rater{n}@example.com',
+                username=f'rater{n}',
+                password='pass123'
+            )
+            for n in range(2)
+        ]
+        self.product = Product.objects.create(name='Rated Product', price=10, stock=1)
+        self.url = f'/api/products/{self.product.id}/ratings/'
+
+    def rate(self, user, score):
+        self.client.force_authenticate(user=user)
+        return self.client.post(self.url, {'score': score}, format='json')
+
+    def totals(self):
+        product = Product.objects.get(pk=self.product.pk)
+        return product.rating_count, product.rating_sum
+
+    def test_first_rating_creates_and_second_updates(self):
+        self.assertEqual(self.rate(self.users[0], 4).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.rate(self.users[0], 2).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(Rating.objects.filter(product=self.product).count(), 1)
+        self.assertEqual(self.totals(), (1, 2))
+
+    def test_totals_follow_every_write(self):
+        self.rate(self.users[0], 5)
+        self.rate(self.users[1], 3)
+        self.rate(self.users[1], 3)
+        self.rate(self.users[1], 1)
+
+        self.assertEqual(self.totals(), (2, 6))
+
+    def test_deleting_a_rating_recounts(self):
+        self.rate(self.users[0], 5)
+        self.rate(self.users[1], 3)
+
+        Rating.objects.get(customer=self.users[0]).delete()
+
+        self.assertEqual(self.totals(), (1, 3))
+
+    def test_unknown_product_is_404(self):
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.post('/api/products/999999/ratings/', {'score': 3}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+ORIGINAL = (
+    "I bought this kettle for my office and it boils a full litre in under three minutes, "
+    "the handle stays cool, the lid opens with one hand and after two months of daily use "
+    "there is no limescale build up and no plastic taste in the water at all"
+)
+# same review with one word changed, as spam accounts tend to post it
+NEAR_COPY = ORIGINAL.replace("office", "kitchen")
+UNRELATED = (
+    "The running shoes were a half size too small so I sent them back, the refund reached "
+    "my card within a week and the courier picked the parcel up from my door"
+)
+
+
+class MinHashTest(SimpleTestCase):
+    def signature(self, body):
+        return spam.minhash(spam.shingles(body))
+
+    def test_short_bodies_are_not_shingled(self):
+        self.assertEqual(spam.shingles("Great product, love it!"), set())
+
+    def test_shingles_ignore_case_and_punctuation(self):
+        self.assertEqual(spam.shingles(ORIGINAL.upper().replace(",", " ,")), spam.shingles(ORIGINAL))
+
+    def test_similarity_tracks_overlap(self):
+        self.assertEqual(spam.similarity(self.signature(ORIGINAL), self.signature(ORIGINAL)), 1.0)
+        self.assertGreaterEqual(
+            spam.similarity(self.signature(ORIGINAL), self.signature(NEAR_COPY)), spam.SIMILARITY_THRESHOLD
+        )
+        self.assertLess(spam.similarity(self.signature(ORIGINAL), self.signature(UNRELATED)), 0.2)
+
+    def test_signature_round_trips(self):
+        signature = self.signature(ORIGINAL)
+        self.assertEqual(list(spam.unpack(spam.pack(signature))), signature)
+
+
+class DuplicateFlaggingTest(APITestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Kettle', price=10, stock=1)
+        self.users = [
+            Customer.objects.create_user(
+                email=f'commenter{n}@example.com',
+                username=f'commenter{n}',
+                password='pass123'
+            )
+            for n in range(3)
+        ]
+
+    def post(self, user, body):
+        self.client.force_authenticate(user=user)
+        return self.client.post(f'/api/products/{self.product.id}/comments/', {'body': body}, format='json')
+
+    def test_near_copy_is_flagged(self):
+        original = self.post(self.users[0], ORIGINAL)
+        copy = self.post(self.users[1], NEAR_COPY)
+        other = self.post(self.users[2], UNRELATED)
+
+        flagged = Comment.objects.get(pk=copy.data['id'])
+        self.assertTrue(flagged.is_flagged)
+        self.assertIn(f"#{original.data['id']}", flagged.flag_reason)
+        self.assertFalse(Comment.objects.get(pk=original.data['id']).is_flagged)
+        self.assertFalse(Comment.objects.get(pk=other.data['id']).is_flagged)
+
+    def test_backfill_compares_only_with_older_comments(self):
+        # an old comment from before indexing, then a newer copy indexed by the live path
+        original = Comment.objects.create(product=self.product, customer=self.users[0], body=ORIGINAL)
+        copy = self.post(self.users[1], NEAR_COPY)
+
+        call_command('backfill_comment_signatures', '--flag', stdout=StringIO())
+
+        original.refresh_from_db()
+        self.assertFalse(original.is_flagged)
+        self.assertTrue(hasattr(original, 'signature'))
+        self.assertFalse(Comment.objects.get(pk=copy.data['id']).is_flagged)
+
+
+class BannedTermMatcherTest(SimpleTestCase):
+    def test_substring_terms_match_inside_words(self):
+        matcher = Matcher([("scam", False)])
+
+        self.assertEqual(matcher.find("What a SCAMMY seller"), "scam")
+        self.assertIsNone(matcher.find("Scan the code"))
+
+    def test_whole_word_terms_respect_boundaries(self):
+        matcher = Matcher([("ass", True)])
+
+        self.assertIsNone(matcher.find("First class, would pass it on"))
+        self.assertEqual(matcher.find("what an ass!"), "ass")
+        self.assertEqual(matcher.find("ass"), "ass")
+
+    def test_overlapping_terms(self):
+        matcher = Matcher([("he", False), ("she", False), ("hers", False), ("his", False)])
+
+        self.assertEqual(matcher.find("ushers"), "she")
+        self.assertEqual(matcher.find("xhis"), "his")
+        self.assertEqual(matcher.find("hers"), "he")
+
+    def test_failure_links_resume_in_shorter_term(self):
+        # after "abc" fails on "e", matching must continue from "bc", not restart
+        matcher = Matcher([("abcd", False), ("bce", False)])
+
+        self.assertEqual(matcher.find("abce"), "bce")
+        self.assertIsNone(matcher.find("abcbd"))
+
+    def test_whole_word_found_after_a_rejected_occurrence(self):
+        matcher = Matcher([("bad", True)])
+
+        self.assertEqual(matcher.find("badly made, bad product"), "bad")
+
+    def test_whitespace_is_normalised(self):
+        matcher = Matcher([("bad word", False)])
+
+        self.assertEqual(matcher.find("a Bad \n  Word here"), "bad word")
+
+
+class BannedTermCommentTest(APITestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Banned Product', price=10, stock=1)
+        self.user = Customer.objects.create_user(
+            email='banned@example.com',
+            username='banneduser',
+            password='pass123'
+        )
+        BannedTerm.objects.create(term='Free  Money', whole_word=True)
+        self.client.force_authenticate(user=self.user)
+
+    def test_comment_with_banned_term_is_rejected(self):
+        response = self.client.post(
+            f'/api/products/{self.product.id}/comments/', {'body': 'Click here for FREE money now'}, format='json'
+        )
+
+        comment = Comment.objects.get(pk=response.data['id'])
+        self.assertEqual(comment.status, 'rejected')
+        self.assertEqual(comment.flag_reason, 'Banned term: "free money"')
+
+    def test_deleted_term_no_longer_matches(self):
+        BannedTerm.objects.all().delete()
+
+        response = self.client.post(
+            f'/api/products/{self.product.id}/comments/', {'body': 'Click here for free money now'}, format='json'
+        )
+
+        self.assertEqual(Comment.objects.get(pk=response.data['id']).status, 'pending')
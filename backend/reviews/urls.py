@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ProductCommentView, ProductRatingView
+from .views import ProductCommentView, ProductRatingView, PendingCommentListView, BulkModerateCommentsView
 
 urlpatterns = [
     # /api/products/5/comments/
@@ -7,4 +7,8 @@ urlpatterns = [
     
     # /api/products/5/ratings/
     path('products/<int:product_id>/ratings/', ProductRatingView.as_view(), name='product-ratings'),
+
+    # moderation queue
+    path('comments/pending/', PendingCommentListView.as_view(), name='pending-comments'),
+    path('comments/moderate/', BulkModerateCommentsView.as_view(), name='bulk-moderate-comments'),
 ]
\ No newline at end of file
@@ -1,36 +1,123 @@
 from rest_framework import generics, permissions, status
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from products.models import Product
-from .models import Comment, Rating
-from .serializers import CommentSerializer, RatingSerializer
+from .models import Comment
+from .serializers import CommentSerializer, RatingSerializer, ModerationCommentSerializer
+from .pagination import ModerationQueuePagination, ProductCommentPagination
+from .cache import get_first_page, set_first_page, invalidate_first_pages
+from .spam import screen_body, index_comment
+from .banned import find_banned_term
+from .ratings import submit_rating
 
 class ProductCommentView(generics.ListCreateAPIView): #viewing comments
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly] # guests can read, but only logged-in users can write
+    pagination_class = ProductCommentPagination
 
     def get_queryset(self):
         # find which product is commented, and only return approved comments
         product_id = self.kwargs['product_id']
-        return Comment.objects.filter(product_id=product_id, status='approved')
+        return Comment.objects.filter(product_id=product_id, status='approved').select_related('customer')
+
+    def list(self, request, *args, **kwargs):
+        # the default first page is what almost every visitor sees, so it is cached per product
+        is_first_page = not request.query_params.get('cursor') and not request.query_params.get('page_size')
+        if not is_first_page:
+            return super().list(request, *args, **kwargs)
+
+        product_id = self.kwargs['product_id']
+        data = get_first_page(product_id)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            set_first_page(product_id, data)
+        return Response(data)
     
     def perform_create(self,serializer):
         # we grab the information from the request and URL instead of directly pulling from user
         product_id = self.kwargs['product_id']
         product = get_object_or_404(Product, pk=product_id)
 
-        serializer.save(customer=self.request.user, product=product)
+        body = serializer.validated_data['body']
+        extra = {}
+        # banned terms reject outright; near-duplicates stay pending but are flagged for moderators
+        banned = find_banned_term(body)
+        screening = screen_body(body)
+        if banned is not None:
+            extra = {'status': 'rejected', 'is_flagged': True, 'flag_reason': f'Banned term: "{banned}"'}
+        elif screening.duplicate_of is not None:
+            extra = {'is_flagged': True, 'flag_reason': screening.flag_reason}
+        with transaction.atomic():
+            comment = serializer.save(customer=self.request.user, product=product, **extra)
+            index_comment(comment, screening)
 
 class ProductRatingView(generics.CreateAPIView):
+    # POST again to change your rating: 201 when created, 200 when updated
     serializer_class = RatingSerializer
     permission_classes = [permissions.IsAuthenticated] # only logged in users
 
-    def perform_create(self, serializer):
-        product_id = self.kwargs['product_id']
-        product = get_object_or_404(Product, pk=product_id)
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        score = serializer.validated_data['score']
+
+        result = submit_rating(self.kwargs['product_id'], request.user, score)
+        if result is None:
+            raise Http404("No Product matches the given query.")
+        rating_id, created = result
+        return Response(
+            {"id": rating_id, "score": score},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class PendingCommentListView(generics.ListAPIView):
+    # /api/comments/pending/?cursor=...&flagged=true  (moderators only)
+    serializer_class = ModerationCommentSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = ModerationQueuePagination
+
+    def get_queryset(self):
+        queryset = Comment.objects.filter(status='pending').select_related('customer', 'product')
+        flagged = self.request.query_params.get('flagged')
+        if flagged is not None:
+            queryset = queryset.filter(is_flagged=flagged.lower() in ('1', 'true', 'yes'))
+        return queryset
+
+
+BULK_MODERATION_MAX_IDS = 1000
+
+
+class BulkModerateCommentsView(APIView):
+    # POST /api/comments/moderate/ {"ids": [...], "status": "approved" | "rejected"}
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        ids = request.data.get('ids')
+        new_status = request.data.get('status')
+
+        if new_status not in ('approved', 'rejected'):
+            return Response({"detail": "status must be 'approved' or 'rejected'."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not ids:
+            return Response({"detail": "ids must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > BULK_MODERATION_MAX_IDS:
+            return Response(
+                {"detail": f"At most {BULK_MODERATION_MAX_IDS} comments per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids = [int(comment_id) for comment_id in ids]
+        except (TypeError, ValueError):
+            return Response({"detail": "ids must be integers."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if Rating.objects.filter(product=product, customer=self.request.user).exists(): #checks if user already rated
-            raise ValidationError("You have already rated this product!") #validation error, change here if you want to be able to rate products again,
+        # only pending comments move; already-moderated ones are left alone
+        pending = Comment.objects.filter(id__in=ids, status='pending')
+        product_ids = list(pending.values_list('product_id', flat=True).distinct())
+        updated = pending.update(status=new_status)
+        if new_status == 'approved':
+            invalidate_first_pages(product_ids)
 
-        serializer.save(customer=self.request.user, product=product)
\ No newline at end of file
+        return Response({"status": new_status, "updated": updated, "skipped": len(set(ids)) - updated})
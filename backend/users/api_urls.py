@@ -1,10 +1,12 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView, UserProfileView
+from .views import UserProfileView
+from .async_views import login_view, register_view
 
 urlpatterns = [
-    path('register/', RegisterView.as_view(), name='register'),
-    path('login/', LoginView.as_view(), name='login'),
+    # async: password hashing runs in a thread pool (users.hashing)
+    path('register/', register_view, name='register'),
+    path('login/', login_view, name='login'),
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('me/', UserProfileView.as_view(), name='user_profile'),
 ]
@@ -0,0 +1,115 @@
+"""
+Async login and register, served at /api/auth/. They do the same work as
+LoginView and RegisterView, but password hashing runs in users.hashing's
+thread pool, so a burst of logins does not hold up other requests. Login goes
+through aauthenticate(), so AUTHENTICATION_BACKENDS and user_login_failed
+apply as they do for LoginView; users.backends.ModelBackend keeps its hashing
+in the pool.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from .authentication import CustomerRefreshToken
+from .hashing import HasherBusy, amake_password
+from .serializers import RegisterSerializer
+from .throttling import LOGIN_THROTTLES, REGISTER_THROTTLES
+
+
+def _throttled(request, throttle_classes, view):
+    """
+    Runs the same throttles as the DRF views; returns a 429 response or None.
+    They talk to the cache synchronously, so async views call this through
+    sync_to_async.
+    """
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            waits.append(throttle.wait() or 0)
+    if not waits:
+        return None
+    wait = math.ceil(max(waits))
+    response = JsonResponse(
+        {"detail": f"Request was throttled. Expected available in {wait} seconds."}, status=429
+    )
+    response["Retry-After"] = str(wait)
+    return response
+
+
+def _busy():
+    response = JsonResponse({"detail": "Too many sign-ins in progress, try again shortly."}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+def _drf_request(request):
+    # a DRF Request gives the throttles request.data
+    return Request(request, parsers=[JSONParser()])
+
+
+@csrf_exempt
+@require_POST
+async def login_view(request):
+    drf_request = _drf_request(request)
+    try:
+        data = drf_request.data
+    except ParseError:
+        data = None
+    if not isinstance(data, dict):
+        return JsonResponse({"detail": "Expected a JSON object."}, status=400)
+    email = data.get("email")
+    password = data.get("password")
+
+    if not email or not password:
+        return JsonResponse({"detail": "Email and password are required."}, status=400)
+
+    throttled = await sync_to_async(_throttled)(drf_request, LOGIN_THROTTLES, login_view)
+    if throttled is not None:
+        return throttled
+
+    try:
+        user = await aauthenticate(request, username=email, password=password)
+    except HasherBusy:
+        return _busy()
+
+    if user is None:
+        return JsonResponse({"detail": "Invalid credentials."}, status=401)
+
+    refresh = CustomerRefreshToken.for_user(user)
+    return JsonResponse({"refresh": str(refresh), "access": str(refresh.access_token)})
+
+
+@csrf_exempt
+@require_POST
+async def register_view(request):
+    drf_request = _drf_request(request)
+    try:
+        data = drf_request.data
+    except ParseError:
+        data = None
+    if not isinstance(data, dict):
+        return JsonResponse({"detail": "Expected a JSON object."}, status=400)
+
+    throttled = await sync_to_async(_throttled)(drf_request, REGISTER_THROTTLES, register_view)
+    if throttled is not None:
+        return throttled
+
+    serializer = RegisterSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        password_hash = await amake_password(serializer.validated_data["password"])
+    except HasherBusy:
+        return _busy()
+
+    await sync_to_async(serializer.save)(password_hash=password_hash)
+    return JsonResponse(serializer.data, status=201)
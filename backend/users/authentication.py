@@ -0,0 +1,117 @@
+"""
+JWT authentication without a user query on every request.
+
+Tokens issued through CustomerRefreshToken carry the fields most views need
+(email, is_staff, role) plus the user's token_version as "ver". A request
+with such a token gets a Customer built from those claims, with every other
+field deferred. The only lookup left is the token version, which is cached
+for TOKEN_VERSION_TTL seconds and dropped whenever the user is saved here.
+Tokens without "ver" are rejected. Customer.save() and Customer.objects.update()
+both bump token_version when is_active or is_staff changes; raw SQL does not.
+
+Views that really need the whole row call get_full_user(), which keeps the
+values in a short-lived per-process cache.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+TOKEN_VERSION_TTL = 60
+FULL_USER_TTL = 30
+FULL_USER_MAX_ENTRIES = 10_000
+
+# claims copied onto the lightweight user, besides the id
+CLAIM_FIELDS = ("email", "is_staff")
+
+_full_users = {}  # user_id -> (expires_at, token_version, field_names, values)
+
+
+class CustomerRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["email"] = user.email
+        token["is_staff"] = user.is_staff
+        token["role"] = getattr(user, "role", None)
+        token["ver"] = user.token_version
+        return token
+
+
+class CustomerTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = CustomerRefreshToken
+
+
+def token_version_key(user_id):
+    return f"users:{user_id}:token_version"
+
+
+def current_token_version(user_id):
+    """The user's token_version, or -1 if they are inactive or gone."""
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        row = get_user_model().objects.filter(pk=user_id).values_list("token_version", "is_active").first()
+        version = row[0] if row is not None and row[1] else -1
+        cache.set(key, version, TOKEN_VERSION_TTL)
+    return version
+
+
+def forget_user(user_id):
+    cache.delete(token_version_key(user_id))
+    _full_users.pop(user_id, None)
+
+
+def claims_user(validated_token):
+    Customer = get_user_model()
+    known = {f: validated_token[f] for f in CLAIM_FIELDS}
+    known.update(id=validated_token[api_settings.USER_ID_CLAIM], is_active=True)
+    # from_db expects the values in model field order
+    field_names = [f.attname for f in Customer._meta.concrete_fields if f.attname in known]
+    user = Customer.from_db(DEFAULT_DB_ALIAS, field_names, [known[name] for name in field_names])
+    if validated_token.get("role") is not None:
+        user.role = validated_token["role"]
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if "ver" not in validated_token:
+            # issued before token versions existed: it cannot be revoked, so it is not accepted
+            raise InvalidToken("Token has no version claim; sign in again.")
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if validated_token["ver"] != current_token_version(user_id):
+            raise AuthenticationFailed("Token is no longer valid.", code="token_revoked")
+        return claims_user(validated_token)
+
+
+def get_full_user(user):
+    """
+    A fully loaded copy of user, for read-only use. Rows are cached per process
+    for FULL_USER_TTL seconds; load the user from the database before changing it.
+    """
+    if not user.get_deferred_fields():
+        return user
+
+    Customer = get_user_model()
+    version = current_token_version(user.pk)
+    entry = _full_users.get(user.pk)
+    if entry is None or entry[0] < time.monotonic() or entry[1] != version:
+        full = Customer.objects.get(pk=user.pk)
+        field_names = [f.attname for f in Customer._meta.concrete_fields]
+        entry = (time.monotonic() + FULL_USER_TTL, version, field_names, [getattr(full, f) for f in field_names])
+        if len(_full_users) >= FULL_USER_MAX_ENTRIES:
+            _full_users.clear()
+        _full_users[user.pk] = entry
+
+    return Customer.from_db(DEFAULT_DB_ALIAS, entry[2], entry[3])
@@ -0,0 +1,30 @@
+from django.contrib.auth import backends, get_user_model
+
+from .hashing import acheck_password, amake_password
+
+Customer = get_user_model()
+
+
+class ModelBackend(backends.ModelBackend):
+    """
+    Django's ModelBackend, but the async path hashes in users.hashing's pool.
+
+    The stock aauthenticate() verifies the password on the event loop itself.
+    Here it may raise HasherBusy when the pool is full; callers turn that into
+    a 503. As with acheck_password, hash upgrades are left to the sync path.
+    """
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(Customer.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await Customer._default_manager.aget_by_natural_key(username)
+        except Customer.DoesNotExist:
+            # hash anyway so unknown emails take as long as wrong passwords
+            await amake_password(password)
+            return None
+        if await acheck_password(password, user.password) and self.user_can_authenticate(user):
+            return user
+        return None
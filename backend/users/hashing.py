@@ -0,0 +1,62 @@
+"""
+A bounded thread pool for password hashing.
+
+PBKDF2 takes ~100ms of CPU per call. Run on the request thread it stalls the
+ASGI event loop (or a whole WSGI worker); run here, it only occupies one of
+PASSWORD_HASH_WORKERS threads while the loop keeps serving other requests.
+hashlib releases the GIL while it hashes, so the workers really run in
+parallel. At most PASSWORD_HASH_QUEUE calls may be running or waiting; past
+that, callers get HasherBusy straight away instead of queueing without end.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HasherBusy(Exception):
+    pass
+
+
+_executor = None
+_lock = threading.Lock()
+_in_flight = 0
+
+
+def _workers():
+    return getattr(settings, "PASSWORD_HASH_WORKERS", None) or os.cpu_count() or 2
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="password-hash")
+    return _executor
+
+
+async def run_hasher(func, *args):
+    global _in_flight
+    limit = getattr(settings, "PASSWORD_HASH_QUEUE", None) or _workers() * 4
+    with _lock:
+        if _in_flight >= limit:
+            raise HasherBusy()
+        _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+
+async def acheck_password(password, encoded):
+    # no setter: hash upgrades are left to the sync login path
+    return await run_hasher(check_password, password, encoded)
+
+
+async def amake_password(password):
+    return await run_hasher(make_password, password)
@@ -0,0 +1,70 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+SYNC_LOGIN = "/api/users/login/"
+ASYNC_LOGIN = "/api/auth/login/"
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire a burst of logins through the ASGI handler and measure how many other "
+        "requests get served meanwhile, for the sync LoginView and the async login view. "
+        "Signs in as an existing test account; run it against a staging database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", required=True, help="Existing account to sign in as.")
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--logins", type=int, default=32, help="Concurrent login requests per run.")
+        parser.add_argument("--probers", type=int, default=4, help="Concurrent clients sending other requests.")
+        parser.add_argument("--probe-path", default="/api/products/products/")
+        parser.add_argument("--queue", type=int, help="Override PASSWORD_HASH_QUEUE for the async run.")
+
+    def handle(self, *args, **options):
+        # the throttles would stop the burst after a few attempts
+        queue = {"PASSWORD_HASH_QUEUE": options["queue"]} if options["queue"] else {}
+        with override_settings(ALLOWED_HOSTS=["testserver"], AUTH_THROTTLES_ENABLED=False, **queue):
+            for label, path in (("sync  LoginView ", SYNC_LOGIN), ("async login_view", ASYNC_LOGIN)):
+                result = asyncio.run(self.burst(path, options))
+                self.report(label, result)
+
+    async def burst(self, login_path, options):
+        client = AsyncClient()
+        latencies = []
+        statuses = []
+        done = asyncio.Event()
+
+        credentials = {"email": options["email"], "password": options["password"]}
+
+        async def login():
+            response = await client.post(login_path, credentials, content_type="application/json")
+            statuses.append(response.status_code)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get(options["probe_path"])
+                latencies.append(time.perf_counter() - started)
+
+        probers = [asyncio.create_task(probe()) for _ in range(options["probers"])]
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(options["logins"])))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*probers)
+        return elapsed, statuses, latencies
+
+    def report(self, label, result):
+        elapsed, statuses, latencies = result
+        ok = statuses.count(200)
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000 if latencies else 0
+        p99 = latencies[int(len(latencies) * 0.99) - 1 if len(latencies) > 1 else 0] * 1000 if latencies else 0
+        self.stdout.write(
+            f"{label}: {ok}/{len(statuses)} logins in {elapsed:.2f}s ({ok / elapsed:.1f}/s); "
+            f"other requests: {len(latencies) / elapsed:.1f}/s, p50 {p50:.0f}ms, p99 {p99:.0f}ms"
+        )
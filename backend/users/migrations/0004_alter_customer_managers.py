@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:25
+
+import users.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_customer_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customer',
+            managers=[
+                ('objects', users.models.CustomerManager()),
+            ],
+        ),
+    ]
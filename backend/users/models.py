@@ -1,8 +1,30 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 
 # Create your models here.
 
+
+class CustomerQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # bulk deactivation / staff changes skip Customer.save(); bump the version here
+        # too, so e.g. .update(is_active=False) revokes tokens like a save would
+        if 'is_active' not in kwargs and 'is_staff' not in kwargs:
+            return super().update(**kwargs)
+        from .authentication import forget_user
+
+        user_ids = list(self.values_list('pk', flat=True))
+        kwargs.setdefault('token_version', models.F('token_version') + 1)
+        updated = self.model._base_manager.filter(pk__in=user_ids).update(**kwargs)
+        for user_id in user_ids:
+            forget_user(user_id)
+        return updated
+
+    update.alters_data = True
+
+
+class CustomerManager(UserManager.from_queryset(CustomerQuerySet)):
+    pass
+
 class Customer(AbstractUser):
     # username, first_name, last_name, email, password,
 
@@ -10,9 +32,41 @@ class Customer(AbstractUser):
     email = models.EmailField(unique=True)
 
 
+    # copied into issued JWTs; bumping it revokes every token handed out so far
+    token_version = models.PositiveIntegerField(default=0)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username'] 
 
+    objects = CustomerManager()
+
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_access = (instance.__dict__.get('is_active'), instance.__dict__.get('is_staff'))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # users built from token claims have most fields deferred; the first
+        # deferred attribute read loads all of them in one query, not one each
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def save(self, *args, **kwargs):
+        # deactivating a user or changing staff rights invalidates their tokens,
+        # which carry is_staff and are otherwise trusted until they expire
+        loaded = getattr(self, '_loaded_access', None)
+        current = (self.__dict__.get('is_active'), self.__dict__.get('is_staff'))
+        if loaded is not None and not self._state.adding and current != loaded:
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_access = (self.__dict__.get('is_active'), self.__dict__.get('is_staff'))
+
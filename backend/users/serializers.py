@@ -25,8 +25,13 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         password = validated_data.pop("password")
+        # the async register view hashes in a thread pool and passes the result in
+        password_hash = validated_data.pop("password_hash", None)
         user = Customer(**validated_data)
-        user.set_password(password)  # 🔒 Şifre burada güvenli şekilde hashleniyor
+        if password_hash is not None:
+            user.password = password_hash
+        else:
+            user.set_password(password)  # 🔒 Şifre burada güvenli şekilde hashleniyor
         user.save()
         return user
 
@@ -1,3 +1,199 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework import status
 
-# Create your tests here.
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from products import auth_views
+from . import views
+from .authentication import ClaimsJWTAuthentication, CustomerRefreshToken, forget_user, get_full_user
+from .throttling import AuthEndpointThrottle, LoginIPThrottle
+
+Customer = get_user_model()
+
+
+class ThrottleKeyTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_ip_key_ignores_forwarded_for(self):
+        keys = {
+            LoginIPThrottle().get_cache_key(
+                Request(self.factory.post('/', HTTP_X_FORWARDED_FOR=forwarded, REMOTE_ADDR='10.0.0.1')), None
+            )
+            for forwarded in ('1.1.1.1', '2.2.2.2')
+        }
+        self.assertEqual(len(keys), 1)
+        self.assertIn('10.0.0.1', keys.pop())
+
+    def test_endpoint_key_includes_module(self):
+        throttle = AuthEndpointThrottle()
+        users_key = throttle.get_cache_key(None, views.RegisterView())
+        products_key = throttle.get_cache_key(None, auth_views.RegisterView())
+
+        self.assertNotEqual(users_key, products_key)
+        self.assertIn('users.views.RegisterView', users_key)
+
+
+# a fast hasher keeps the repeated logins cheap
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Customer.objects.create_user(
+            email='throttle@example.com',
+            username='throttleuser',
+            password='pass123'
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, password, ip='10.0.0.1'):
+        return self.client.post(
+            '/api/auth/login/',
+            {'email': 'throttle@example.com', 'password': password},
+            format='json',
+            REMOTE_ADDR=ip
+        )
+
+    def test_account_limit_applies_across_addresses(self):
+        for attempt in range(5):
+            response = self.login('wrong', ip=f'10.0.0.{attempt + 1}')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.login('pass123', ip='10.0.0.99')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_valid_login_returns_tokens(self):
+        response = self.login('pass123')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.json())
+
+    def test_failed_login_sends_signal(self):
+        failures = []
+
+        def receiver(sender, credentials, **kwargs):
+            failures.append(credentials)
+
+        user_login_failed.connect(receiver)
+        try:
+            response = self.login('wrong')
+        finally:
+            user_login_failed.disconnect(receiver)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0]['username'], 'throttle@example.com')
+
+    def test_inactive_user_cannot_login(self):
+        Customer.objects.filter(email='throttle@example.com').update(is_active=False)
+
+        self.assertEqual(self.login('pass123').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.AllowAllUsersModelBackend'])
+    def test_configured_backends_apply(self):
+        Customer.objects.filter(email='throttle@example.com').update(is_active=False)
+
+        self.assertEqual(self.login('pass123').status_code, status.HTTP_200_OK)
+
+    @override_settings(AUTH_THROTTLES_ENABLED=False)
+    def test_throttles_can_be_switched_off(self):
+        for _ in range(6):
+            response = self.login('wrong')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Customer.objects.create_user(
+            email='claims@example.com',
+            username='claimsuser',
+            password='pass123'
+        )
+        self.factory = APIRequestFactory()
+
+    def tearDown(self):
+        forget_user(self.user.pk)
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ClaimsJWTAuthentication().authenticate(Request(request))
+
+    def access_token(self):
+        return CustomerRefreshToken.for_user(Customer.objects.get(pk=self.user.pk)).access_token
+
+    def test_valid_token_needs_no_user_query(self):
+        token = self.access_token()
+        self.authenticate(token)  # caches the token version
+
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+
+        self.assertEqual((user.pk, user.email, user.is_staff), (self.user.pk, 'claims@example.com', False))
+        self.assertIn('username', user.get_deferred_fields())
+
+    def test_deactivated_user_is_rejected(self):
+        token = self.access_token()
+        self.authenticate(token)
+
+        user = Customer.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_bulk_deactivation_is_rejected(self):
+        token = self.access_token()
+        self.authenticate(token)
+
+        Customer.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_bumped_version_is_rejected(self):
+        token = self.access_token()
+        Customer.objects.filter(pk=self.user.pk).update(is_staff=True)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.assertEqual(Customer.objects.get(pk=self.user.pk).token_version, 1)
+
+    def test_tampered_version_is_rejected(self):
+        token = str(self.access_token())
+        header, payload, signature = token.split('.')
+        forged = AccessToken(token)
+        forged['ver'] = 7
+        _, forged_payload, _ = str(forged).split('.')
+
+        with self.assertRaises(InvalidToken):
+            self.authenticate(f'{header}.{forged_payload}.{signature}')
+
+    def test_missing_version_is_rejected(self):
+        token = self.access_token()
+        del token['ver']
+
+        with self.assertRaises(InvalidToken):
+            self.authenticate(token)
+
+    def test_get_full_user_loads_the_row(self):
+        user, _ = self.authenticate(self.access_token())
+
+        full = get_full_user(user)
+
+        self.assertEqual(full.get_deferred_fields(), set())
+        self.assertEqual(full.username, 'claimsuser')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_full_user(user).username, 'claimsuser')
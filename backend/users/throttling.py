@@ -0,0 +1,100 @@
+"""
+Sliding-window throttles for the login and register endpoints.
+
+DRF's SimpleRateThrottle keeps every request timestamp in a cached list.
+These keep two integers per key instead: the counts of the current and the
+previous fixed window. The previous count is weighted by how much of it
+still overlaps the sliding window, which approximates a true sliding log
+closely at a fraction of the cache traffic.
+
+Rates come from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] under each scope.
+Per-IP keys use DRF's get_ident, which only trusts X-Forwarded-For when
+REST_FRAMEWORK["NUM_PROXIES"] says how many proxies sit in front of us.
+Throttles run in APIView.initial(), before the handler, so a throttled
+login never reaches authenticate() and its password hash.
+AUTH_THROTTLES_ENABLED = False turns them all off, for load tests.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    cache = cache
+
+    def allow_request(self, request, view):
+        if self.rate is None or not getattr(settings, "AUTH_THROTTLES_ENABLED", True):
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = self.duration
+        window_start = int(self.now // window) * window
+        current_key = f"{self.key}:{window_start}"
+        previous_key = f"{self.key}:{window_start - window}"
+
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        overlap = (window - (self.now - window_start)) / window
+        if previous * overlap + current >= self.num_requests:
+            self._wait = self._time_until_allowed(current, previous, window - (self.now - window_start))
+            return False
+
+        # the key must outlive the next window, where it is the "previous" count
+        if not self.cache.add(current_key, 1, 2 * window):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:  # expired between add() and incr()
+                self.cache.set(current_key, 1, 2 * window)
+        return True
+
+    def _time_until_allowed(self, current, previous, remaining):
+        if current >= self.num_requests or not previous:
+            return remaining
+        # previous * (remaining - t) / window + current < num_requests
+        return max(0.0, remaining - (self.num_requests - current) * self.duration / previous)
+
+    def wait(self):
+        return math.ceil(getattr(self, "_wait", 0)) or None
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class LoginAccountThrottle(SlidingWindowThrottle):
+    """Limits attempts against one email, however many addresses they come from."""
+    scope = "login_account"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": email.strip().lower()}
+
+
+class AuthEndpointThrottle(SlidingWindowThrottle):
+    """Caps the total hashing work one endpoint can cause, across all clients."""
+    scope = "auth_endpoint"
+
+    def get_cache_key(self, request, view):
+        # function views (users.async_views) have a __name__, APIView instances do not;
+        # the module keeps same-named views in different apps apart
+        name = getattr(view, "__name__", None) or view.__class__.__name__
+        return self.cache_format % {"scope": self.scope, "ident": f"{view.__module__}.{name}"}
+
+
+class RegisterIPThrottle(LoginIPThrottle):
+    scope = "register_ip"
+
+
+LOGIN_THROTTLES = [LoginIPThrottle, LoginAccountThrottle, AuthEndpointThrottle]
+REGISTER_THROTTLES = [RegisterIPThrottle, AuthEndpointThrottle]
@@ -3,7 +3,8 @@ from django.shortcuts import render
 from rest_framework import status, generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import CustomerRefreshToken, get_full_user
+from .throttling import LOGIN_THROTTLES, REGISTER_THROTTLES
 from .serializers import RegisterSerializer , CustomerProfileSerializer
 
 Customer = get_user_model()
@@ -20,16 +21,20 @@ class CustomerProfileView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         # Always return the currently logged-in user
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return get_full_user(self.request.user)
+        return Customer.objects.get(pk=self.request.user.pk)
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = REGISTER_THROTTLES
 
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = LOGIN_THROTTLES
     
     def post(self, request):
         email = request.data.get('email')
@@ -49,7 +54,7 @@ class LoginView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomerRefreshToken.for_user(user)
 
         return Response(
             {
@@ -65,13 +70,14 @@ class UserProfileView(APIView):
     def get(self, request):
         """Get the current user's profile"""
         from .serializers import UserProfileSerializer
-        serializer = UserProfileSerializer(request.user)
+        serializer = UserProfileSerializer(get_full_user(request.user))
         return Response(serializer.data)
 
     def patch(self, request):
         """Update the current user's profile"""
         from .serializers import UserProfileSerializer
-        serializer = UserProfileSerializer(request.user, data=request.data, partial=True)
+        user = Customer.objects.get(pk=request.user.pk)
+        serializer = UserProfileSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ProductAlert
+
+
+@admin.register(ProductAlert)
+class ProductAlertAdmin(admin.ModelAdmin):
+    list_display = ("product", "kind", "old_price", "new_price", "sent_count", "created_at", "processed_at")
+    list_filter = ("kind", "processed_at")
+    readonly_fields = ("last_wishlist_id", "sent_count", "processed_at")
@@ -0,0 +1,11 @@
+from .models import ProductAlert
+
+
+def queue_back_in_stock(product_ids):
+    """
+    Queues back_in_stock alerts for products restocked by a bulk UPDATE, which
+    skips Product.save() and so never reaches signals.product_saved. One INSERT.
+    """
+    return ProductAlert.objects.bulk_create(
+        [ProductAlert(product_id=product_id, kind="back_in_stock") for product_id in product_ids]
+    )
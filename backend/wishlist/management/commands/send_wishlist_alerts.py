@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from wishlist.models import AlertDelivery, ProductAlert, Wishlist
+
+
+class Command(BaseCommand):
+    help = (
+        "Email everyone who wishlisted a product about queued restocks and price drops. "
+        "Run it from cron; each alert resumes where the last run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Wishlist rows read, emailed and logged per round.")
+        parser.add_argument("--limit", type=int, help="Process at most this many alerts.")
+
+    def handle(self, *args, **options):
+        cooldown = timedelta(hours=getattr(settings, "WISHLIST_ALERT_COOLDOWN_HOURS", 24))
+        pruned, _ = AlertDelivery.objects.filter(sent_at__lt=timezone.now() - cooldown).delete()
+
+        alert_ids = list(
+            ProductAlert.objects.filter(processed_at__isnull=True).order_by("id").values_list("id", flat=True)
+        )[:options["limit"]]
+        self.stdout.write(f"{len(alert_ids)} alerts queued ({pruned} old delivery records pruned)")
+
+        sent = 0
+        started = time.monotonic()
+        connection = get_connection()
+        connection.open()
+        try:
+            for alert_id in alert_ids:
+                alert = ProductAlert.objects.select_related("product").get(pk=alert_id)
+                sent += self.fan_out(alert, connection, options["chunk_size"], cooldown)
+                self.stdout.write(f"alert #{alert.id}: {alert.sent_count} sent ({time.monotonic() - started:.0f}s)")
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {sent} emails sent."))
+
+    def fan_out(self, alert, connection, chunk_size, cooldown):
+        product = alert.product
+        if not self.still_relevant(alert, product):
+            alert.processed_at = timezone.now()
+            alert.save(update_fields=["processed_at"])
+            return 0
+
+        # keyset walk over the (product, id) index
+        rows = Wishlist.objects.filter(product_id=product.id, user__is_active=True).order_by("id").values_list(
+            "id", "user_id", "user__email", "user__first_name"
+        )
+        sent = 0
+        while True:
+            chunk = list(rows.filter(id__gt=alert.last_wishlist_id)[:chunk_size])
+            if not chunk:
+                break
+
+            recent = set(
+                AlertDelivery.objects.filter(
+                    product_id=product.id,
+                    kind=alert.kind,
+                    user_id__in=[user_id for _, user_id, _, _ in chunk],
+                    sent_at__gte=timezone.now() - cooldown,
+                ).values_list("user_id", flat=True)
+            )
+            recipients = [(user_id, email, name) for _, user_id, email, name in chunk if email and user_id not in recent]
+            if recipients:
+                connection.send_messages([self.build_email(alert, product, email, name) for _, email, name in recipients])
+
+            # a crash between sending and this commit re-sends one chunk at most
+            with transaction.atomic():
+                AlertDelivery.objects.bulk_create(
+                    [AlertDelivery(user_id=user_id, product_id=product.id, kind=alert.kind) for user_id, _, _ in recipients]
+                )
+                alert.last_wishlist_id = chunk[-1][0]
+                alert.sent_count += len(recipients)
+                alert.save(update_fields=["last_wishlist_id", "sent_count"])
+            sent += len(recipients)
+
+        alert.processed_at = timezone.now()
+        alert.save(update_fields=["processed_at"])
+        return sent
+
+    def still_relevant(self, alert, product):
+        # the product may have sold out again, or the price gone back up, since the alert was queued
+        if alert.kind == "back_in_stock":
+            return product.stock > 0
+        return alert.old_price is None or product.price < alert.old_price
+
+    def build_email(self, alert, product, email, name):
+        greeting = f"Hi {name}," if name else "Hi,"
+        if alert.kind == "back_in_stock":
+            subject = f"{product.name} is back in stock"
+            body = f"{greeting}\n\n{product.name} from your wishlist is back in stock at ${product.price}."
+        else:
+            subject = f"Price drop: {product.name}"
+            body = (
+                f"{greeting}\n\n{product.name} from your wishlist is now ${product.price} "
+                f"(was ${alert.old_price})."
+            )
+        return EmailMessage(subject=subject, body=body, to=[email])
@@ -10,6 +10,43 @@ class Wishlist(models.Model):
 
     class Meta:
         unique_together = ("user", "product")
+        indexes = [
+            models.Index(fields=["product", "id"]),  # alert fan-out walks a product's rows in id order
+        ]
 
     def __str__(self):
-        return f"{self.user.email} - {self.product.name}"
\ No newline at end of file
+        return f"{self.user.email} - {self.product.name}"
+
+
+class ProductAlert(models.Model):
+    """A restock or price drop waiting to be sent to everyone who wishlisted the product."""
+    KIND_CHOICES = (
+        ("back_in_stock", "Back in stock"),
+        ("price_drop", "Price drop"),
+    )
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # fan-out progress, so an interrupted run resumes where it stopped
+    last_wishlist_id = models.BigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.product_id}"
+
+
+class AlertDelivery(models.Model):
+    """One email sent to a user about a product; used to skip repeats within the cooldown."""
+    user = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=ProductAlert.KIND_CHOICES)
+    sent_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "kind", "sent_at"]),
+        ]
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class WishlistPagination(CursorPagination):
+    # keyset on the primary key, newest first
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
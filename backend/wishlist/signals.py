@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from products.models import Product
+from .models import ProductAlert
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    """
+    Queues one ProductAlert when a product comes back in stock or gets cheaper.
+    Only the alert row is written here; send_wishlist_alerts does the fan-out,
+    so saving a product that 100k users wishlisted stays one extra INSERT.
+    """
+    loaded = getattr(instance, "_loaded_stock_price", None)
+    if created or loaded is None:
+        return
+    old_stock, old_price = loaded
+    new_stock, new_price = instance.__dict__.get("stock"), instance.__dict__.get("price")
+
+    if old_stock == 0 and new_stock:
+        ProductAlert.objects.create(product=instance, kind="back_in_stock")
+    if old_price is not None and new_price is not None and Decimal(str(new_price)) < old_price:
+        ProductAlert.objects.create(product=instance, kind="price_drop", old_price=old_price, new_price=new_price)
@@ -1,3 +1,66 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from cart.models import CartItem
+from products.inventory import decrement_stock, increment_stock, set_shard_count
+from products.models import Product
+from .models import Wishlist
+
+Customer = get_user_model()
+
+
+class MoveToCartTest(APITestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(
+            email='wish@example.com',
+            username='wishuser',
+            password='pass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def sharded_product(self, stock):
+        product = Product.objects.create(name='Sharded Product', price=10, stock=stock)
+        set_shard_count(product.pk, 2)
+        product.refresh_from_db()
+        return product
+
+    def move_all(self, **extra):
+        return self.client.post('/api/wishlist/move-to-cart/', {'ids': 'all', **extra}, format='json')
+
+    def test_sold_out_sharded_product_stays(self):
+        product = self.sharded_product(2)
+        decrement_stock(product, 2)  # Product.stock still shows 2
+        Wishlist.objects.create(user=self.user, product=product)
+
+        response = self.move_all()
+
+        self.assertEqual(response.data['moved'], [])
+        self.assertEqual(response.data['out_of_stock'][0]['stock'], 0)
+        self.assertFalse(CartItem.objects.filter(user=self.user).exists())
+
+    def test_restocked_sharded_product_moves(self):
+        product = self.sharded_product(0)
+        increment_stock(product, 3)  # Product.stock still shows 0
+        Wishlist.objects.create(user=self.user, product=product)
+
+        response = self.move_all()
+
+        self.assertEqual(len(response.data['moved']), 1)
+        self.assertEqual(CartItem.objects.get(user=self.user).product_id, product.id)
+
+    def test_all_reports_a_cursor_at_the_limit(self):
+        products = [Product.objects.create(name=f'Wished {n}', price=10, stock=0) for n in range(3)]
+        items = [Wishlist.objects.create(user=self.user, product=product) for product in products]
+
+        with mock.patch('wishlist.views.MOVE_TO_CART_MAX_ITEMS', 2):
+            first = self.move_all()
+            second = self.move_all(after=first.data['next_after'])
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in first.data['out_of_stock']], [items[0].id, items[1].id])
+        self.assertEqual(first.data['next_after'], items[1].id)
+        self.assertEqual([item['id'] for item in second.data['out_of_stock']], [items[2].id])
+        self.assertIsNone(second.data['next_after'])
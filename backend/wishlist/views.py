@@ -1,17 +1,28 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from .models import Wishlist
+from .pagination import WishlistPagination
 from .serializers import WishlistSerializer
+from cart.models import CartItem
+from cart.reservations import available_stock, hold_stock
 from products.models import Product
 
+BULK_MAX_PRODUCTS = 500
+MOVE_TO_CART_MAX_ITEMS = 500
+
 
 class WishlistViewSet(viewsets.ModelViewSet):
     serializer_class = WishlistSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = WishlistPagination
 
     def get_queryset(self):
-        return Wishlist.objects.filter(user=self.request.user)
+        return Wishlist.objects.filter(user=self.request.user).select_related("product")
 
     def create(self, request, *args, **kwargs):
         product_id = request.data.get("product")
@@ -42,4 +53,131 @@ class WishlistViewSet(viewsets.ModelViewSet):
             )
 
         serializer = self.get_serializer(wishlist_item)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def _product_ids(self, request):
+        product_ids = request.data.get("products")
+        if not isinstance(product_ids, list) or not product_ids:
+            return None, Response({"detail": "products must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(product_ids) > BULK_MAX_PRODUCTS:
+            return None, Response(
+                {"detail": f"At most {BULK_MAX_PRODUCTS} products per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            return sorted({int(product_id) for product_id in product_ids}), None
+        except (TypeError, ValueError):
+            return None, Response({"detail": "products must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["post"], url_path="bulk-add")
+    def bulk_add(self, request):
+        # POST /api/wishlist/bulk-add/ {"products": [1, 2, 3]}
+        product_ids, error = self._product_ids(request)
+        if error:
+            return error
+
+        # one query tells which products exist and which are already wishlisted
+        rows = Product.objects.filter(id__in=product_ids).annotate(
+            wishlisted=Exists(Wishlist.objects.filter(user=request.user, product=OuterRef("pk")))
+        ).values_list("id", "wishlisted")
+        found = dict(rows)
+        to_add = [product_id for product_id, wishlisted in found.items() if not wishlisted]
+
+        # ignore_conflicts covers a concurrent add of the same product
+        Wishlist.objects.bulk_create(
+            [Wishlist(user=request.user, product_id=product_id) for product_id in to_add],
+            ignore_conflicts=True,
+        )
+        return Response(
+            {
+                "added": sorted(to_add),
+                "already_in_wishlist": sorted(pid for pid, wishlisted in found.items() if wishlisted),
+                "not_found": [pid for pid in product_ids if pid not in found],
+            },
+            status=status.HTTP_201_CREATED if to_add else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk-remove")
+    def bulk_remove(self, request):
+        # POST /api/wishlist/bulk-remove/ {"products": [1, 2, 3]}
+        product_ids, error = self._product_ids(request)
+        if error:
+            return error
+
+        removed, _ = Wishlist.objects.filter(user=request.user, product_id__in=product_ids).delete()
+        return Response({"removed": removed})
+
+    @action(detail=False, methods=["post"], url_path="move-to-cart")
+    def move_to_cart(self, request):
+        # POST /api/wishlist/move-to-cart/ {"ids": [wishlist ids]} or {"ids": "all", "after": <next_after>}
+        ids = request.data.get("ids")
+        items = Wishlist.objects.filter(user=request.user)
+        if ids == "all":
+            try:
+                items = items.filter(id__gt=int(request.data.get("after") or 0))
+            except (TypeError, ValueError):
+                return Response({"detail": "after must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            if not isinstance(ids, list) or not ids:
+                return Response({"detail": "ids must be a non-empty list or \"all\"."}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > MOVE_TO_CART_MAX_ITEMS:
+                return Response(
+                    {"detail": f"At most {MOVE_TO_CART_MAX_ITEMS} items per request."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            try:
+                ids = {int(item_id) for item_id in ids}
+            except (TypeError, ValueError):
+                return Response({"detail": "ids must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+            items = items.filter(id__in=ids)
+
+        moved, out_of_stock, lines = [], [], []
+        with transaction.atomic():
+            # stock and current cart quantity for every item, in one query
+            rows = items.select_for_update(of=("self",)).annotate(
+                cart_qty=Coalesce(
+                    Subquery(
+                        CartItem.objects.filter(user=request.user, product=OuterRef("product_id")).values("quantity")[:1]
+                    ),
+                    0,
+                ),
+            ).order_by("id").values_list(
+                "id", "product_id", "product__stock", "product__stock_shards", "cart_qty"
+            )[:MOVE_TO_CART_MAX_ITEMS + 1]
+
+            rows = list(rows)
+            # "all" stops at the limit; the client continues with "after": next_after
+            next_after = rows[MOVE_TO_CART_MAX_ITEMS - 1][0] if len(rows) > MOVE_TO_CART_MAX_ITEMS else None
+            rows = rows[:MOVE_TO_CART_MAX_ITEMS]
+            # same rule as AddToCartView and checkout: exact (shard-summed) stock minus other carts' holds
+            available = available_stock(
+                [Product(id=product_id, stock=stock, stock_shards=shards) for _, product_id, stock, shards, _ in rows],
+                user=request.user,
+            )
+            for item_id, product_id, _, _, cart_qty in rows:
+                # same as AddToCartView: one more unit on top of what is already in the cart
+                quantity = cart_qty + 1
+                stock = available[product_id]
+                if stock < quantity:
+                    out_of_stock.append({"id": item_id, "product": product_id, "stock": stock})
+                    continue
+                lines.append(CartItem(user=request.user, product_id=product_id, quantity=quantity))
+                moved.append({"id": item_id, "product": product_id, "quantity": quantity})
+
+            if lines:
+                CartItem.objects.bulk_create(
+                    lines,
+                    update_conflicts=True,
+                    unique_fields=["user", "product"],
+                    update_fields=["quantity"],
+                )
+                hold_stock(request.user, {line.product_id: line.quantity for line in lines})
+                Wishlist.objects.filter(id__in=[item["id"] for item in moved]).delete()
+
+        found = {item["id"] for item in moved} | {item["id"] for item in out_of_stock}
+        return Response({
+            "moved": moved,
+            "out_of_stock": out_of_stock,
+            "not_found": [] if ids == "all" else sorted(ids - found),
+            "next_after": next_after,
+        })